@@ -1,26 +1,18 @@
 from src.base import BaseEffect
 import math
-import time
 
 class AlienDiagnostic(BaseEffect):
+    name = "AlienDiagnostic"
     def __init__(self, display, audio):
         super().__init__(display, audio)
-        self.last_update = time.time()
     
-    @property
-    def name(self):
-        return "AlienDiagnostic"
-    
-    def update(self, audio_data):
-        time_val = time.time()
-        
-        left_data = audio_data[:self.display.width]
-        right_data = audio_data[self.display.width:]
+    def update(self, ctx):
+        time_val = ctx.t
         
         for module in range(self.display.num_modules):
-            base = module * (self.display.width * self.display.height)
-            data = left_data if module == 0 else right_data
-            module_intensity = sum(data) / len(data)
+            frame = self.display.module_frame(module)[::-1, ::-1]
+            data = ctx.features.module_levels[module].tolist()
+            module_intensity = float(ctx.features.module_mean[module])
             
             for x in range(self.display.width):
                 level = data[x]
@@ -55,7 +47,6 @@ class AlienDiagnostic(BaseEffect):
                     else:
                         color = (0, 0, 0)
                     
-                    index = base + (rot_y * self.display.height + rot_x)
-                    self.display.pixels[index] = color
+                    frame[y, x] = color
         
         self.display.show() 
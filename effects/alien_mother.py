@@ -1,31 +1,22 @@
 from src.base import BaseEffect
 import math
-import random
-import time
 
 class AlienMother(BaseEffect):
     """Simulates the Mother computer interface"""
+    name = "AlienMother"
     
     def __init__(self, display, audio):
         super().__init__(display, audio)
-        self.last_update = time.time()
     
-    @property
-    def name(self):
-        return "AlienMother"
-    
-    def update(self, audio_data):
-        time_val = time.time()
-        
-        # First 8 values for the left module
-        left_data = audio_data[:self.display.width]
-        # Last 8 values for the right module
-        right_data = audio_data[self.display.width:]
+    def update(self, ctx):
+        time_val = ctx.t
+        # Digital noise of every pixel, drawn in one batch: [module][x][y]
+        noise_field = self.rng.random((self.display.num_modules, self.display.width, self.display.height)).tolist()
         
         for module in range(self.display.num_modules):
-            base = module * (self.display.width * self.display.height)
-            data = left_data if module == 0 else right_data
-            module_intensity = sum(data) / len(data)
+            frame = self.rotated_module(module)
+            data = ctx.features.module_levels[module].tolist()
+            module_intensity = float(ctx.features.module_mean[module])
             
             # Scan line igual para ambos os módulos (sem phase)
             scan_position = (time_val * 1.5) % (self.display.height + 1)
@@ -33,12 +24,13 @@ class AlienMother(BaseEffect):
             for x in range(self.display.width):
                 # Ruído digital baseado no áudio do módulo atual
                 noise_threshold = data[x] / 16.0
+                column_noise = noise_field[module][x]
                 # Caracteres com fase específica por módulo para manter variação
                 char_intensity = int(80 + (40 * math.sin(time_val * 3 + module * math.pi)))
                 
                 for y in range(self.display.height):
                     # Digital noise específico por módulo
-                    noise = random.random() < noise_threshold
+                    noise = column_noise[y] < noise_threshold
                     
                     # Calcula distância da linha de scan para efeito de fade
                     scan_distance = abs(y - scan_position)
@@ -63,7 +55,6 @@ class AlienMother(BaseEffect):
                         # Background totalmente preto
                         color = (0, 0, 0)
                     
-                    index = base + (y * self.display.width) + x
-                    self.display.pixels[index] = color
+                    frame[y, x] = color
         
         self.display.show() 
\ No newline at end of file
@@ -1,34 +1,25 @@
 from src.base import BaseEffect
 import math
-import random
-import time
 
 class AlienWarning(BaseEffect):
     """Simulates the vintage CRT-style VU meters of the Nostromo"""
+    name = "AlienWarning"
     
     def __init__(self, display, audio):
         super().__init__(display, audio)
-        self.last_update = time.time()
     
-    @property
-    def name(self):
-        return "AlienWarning"
-    
-    def update(self, audio_data):
-        time_val = time.time()
-        
-        # First 8 values for the left module
-        left_data = audio_data[:self.display.width]
-        # Last 8 values for the right module
-        right_data = audio_data[self.display.width:]
+    def update(self, ctx):
+        time_val = ctx.t
         
         # Smoother pulsation
         base_pulse = (math.sin(time_val * 2) + 1) / 2 * 0.2 + 0.8
         background_variation = (math.sin(time_val * 0.7) + 1) / 2 * 0.3 + 0.7
+        # Flicker of every pixel, drawn in one batch: [module][x][y]
+        noise_field = (self.rng.random((self.display.num_modules, self.display.width, self.display.height)) * 0.1 + 0.95).tolist()
         
         for module in range(self.display.num_modules):
-            base = module * (self.display.width * self.display.height)
-            data = left_data if module == 0 else right_data
+            frame = self.rotated_module(module)
+            data = ctx.features.module_levels[module].tolist()
             
             for x in range(self.display.width):
                 is_left_vu = x < 4
@@ -52,6 +43,7 @@ class AlienWarning(BaseEffect):
                                  int(5 * background_variation))
                     base_color = (intensity, intensity // 2, 0)
                 
+                column_noise = noise_field[module][x]
                 for y in range(self.display.height):
                     y_inv = self.display.height - 1 - y
                     
@@ -59,14 +51,13 @@ class AlienWarning(BaseEffect):
                         if y_inv < level:
                             color = base_color
                         else:
-                            noise = random.random() * 0.1 + 0.95
+                            noise = column_noise[y]
                             dim_red = int(15 * background_variation * noise)
                             dim_green = int(8 * background_variation * noise)
                             color = (dim_red, dim_green, 0)
                     else:
                         color = base_color
                     
-                    index = base + (y * self.display.width) + x
-                    self.display.pixels[index] = color
+                    frame[y, x] = color
         
         self.display.show() 
\ No newline at end of file
@@ -1,32 +1,21 @@
 from src.base import BaseEffect
 import math
-import time
 
 class BladeRunnerNeon(BaseEffect):
     """Neon sign effect with water reflection"""
+    name = "BladeRunnerNeon"
     
     def __init__(self, display, audio):
         super().__init__(display, audio)
-        self.last_update = time.time()
     
-    @property
-    def name(self):
-        return "BladeRunnerNeon"
-    
-    def update(self, audio_data):
-        time_val = time.time()
-        delta_time = time_val - self.last_update
-        self.last_update = time_val
-        
-        # First 8 values for the left module
-        left_data = audio_data[:self.display.width]
-        # Last 8 values for the right module
-        right_data = audio_data[self.display.width:]
+    def update(self, ctx):
+        time_val = ctx.t
+        delta_time = ctx.dt
         
         for module in range(self.display.num_modules):
-            base = module * (self.display.width * self.display.height)
-            data = left_data if module == 0 else right_data
-            module_intensity = sum(data) / len(data)
+            frame = self.rotated_module(module)
+            data = ctx.features.module_levels[module].tolist()
+            module_intensity = float(ctx.features.module_mean[module])
             
             # Fase específica para cada módulo
             module_phase = module * math.pi / 2
@@ -78,7 +67,6 @@ class BladeRunnerNeon(BaseEffect):
                         else:
                             color = (0, 0, 0)
                     
-                    index = base + (y * self.display.width) + x
-                    self.display.pixels[index] = color
+                    frame[y, x] = color
         
         self.display.show() 
\ No newline at end of file
@@ -1,35 +1,25 @@
 from src.base import BaseEffect
 import math
-import time
 
 class BladeRunnerSmog(BaseEffect):
     """Police lights (Spinner) and smog effect"""
+    name = "BladeRunnerSmog"
     
     def __init__(self, display, audio):
         super().__init__(display, audio)
         self.car_x = 7
         self.car_y = 2
-        self.last_update = time.time()
     
-    @property
-    def name(self):
-        return "BladeRunnerSmog"
-    
-    def update(self, audio_data):
-        time_val = time.time()
-        
-        # First 8 values for the left module
-        left_data = audio_data[:self.display.width]
-        # Last 8 values for the right module
-        right_data = audio_data[self.display.width:]
+    def update(self, ctx):
+        time_val = ctx.t
         
         for module in range(self.display.num_modules):
-            base = module * (self.display.width * self.display.height)
-            data = left_data if module == 0 else right_data
+            frame = self.rotated_module(module)
+            data = ctx.features.module_levels[module].tolist()
             
             # Calculate intensities using only current channel data
-            bass_intensity = min(1.0, sum(data[:4]) / (4 * 8))
-            treble_intensity = min(1.0, sum(data[4:]) / (4 * 8))
+            bass_intensity = float(ctx.features.module_low[module])
+            treble_intensity = float(ctx.features.module_high[module])
             
             for x in range(self.display.width):
                 for y in range(self.display.height):
@@ -96,7 +86,6 @@ class BladeRunnerSmog(BaseEffect):
                         min(255, base_color + blue + int(smoke_light_interaction * (0 if is_red else 1)))
                     )
                     
-                    index = base + (y * self.display.width) + x
-                    self.display.pixels[index] = color
+                    frame[y, x] = color
         
         self.display.show() 
\ No newline at end of file
@@ -1,104 +1,68 @@
 from src.base import BaseEffect
+from src.render.points import MovementPoints
 import math
-import random
-import time
+import numpy as np
 
 class NegativeMotion(BaseEffect):
     """Motion effect with inverted colors - gray background with black movement"""
+    name = "NegativeMotion"
     
     def __init__(self, display, audio):
         super().__init__(display, audio)
         # Define centers for each module
-        self.centers = [
-            (display.width / 2, display.height / 2),  # Center of module 0
-            (display.width / 2, display.height / 2)   # Center of module 1
-        ]
+        self.centers = np.array([
+            (display.width / 2, display.height / 2)  # Center of each module
+            for _ in range(display.num_modules)
+        ])
         self.max_distance = math.sqrt((display.width * display.width) + (display.height * display.height))
-        self.movement_points = []  # List of active movement points
-        
-    @property
-    def name(self):
-        return "NegativeMotion"
+        self.movement_points = MovementPoints()  # Active movement points
+        self.darkening = np.zeros((display.num_modules, display.height, display.width))
     
-    def update_movement_points(self, audio_data):
+    def update_movement_points(self, features):
+        points = self.movement_points
         # Remove old points
-        self.movement_points = [p for p in self.movement_points if p['life'] > 0]
+        points.remove_dead()
         
         # Process audio data separately for each module
         for module in range(self.display.num_modules):
-            module_data = audio_data[module * self.display.width:(module + 1) * self.display.width]
-            center_x, center_y = self.centers[module]
+            module_data = features.module_levels[module]
             
-            for i, value in enumerate(module_data):
-                if value > 3:  # Threshold to create new point
-                    # Random position in module
-                    x = random.uniform(0, self.display.width)
-                    y = random.uniform(0, self.display.height)
-                    
-                    # Add new point with reduced intensity
-                    self.movement_points.append({
-                        'x': x,
-                        'y': y,
-                        'intensity': value * 0.7,  # Reduce base intensity
-                        'life': 12,  # Reduce lifetime a bit
-                        'direction': random.uniform(-0.15, 0.15),  # Reduce randomness
-                        'module': module,
-                        'center_x': center_x,
-                        'center_y': center_y
-                    })
+            # Threshold to create new point
+            values = module_data[module_data > 3]
+            if not len(values):
+                continue
+            # Random position in module
+            x = self.rng.uniform(0, self.display.width, len(values))
+            y = self.rng.uniform(0, self.display.height, len(values))
+            # Add new points with reduced intensity, lifetime and randomness
+            direction = self.rng.uniform(-0.15, 0.15, len(values))
+            points.add(x, y, values * 0.7, 12, direction, module)
         
-        # Update position and lifetime of points
-        for point in self.movement_points:
-            # Move point towards module center
-            dx = point['center_x'] - point['x']
-            dy = point['center_y'] - point['y']
-            dist = math.sqrt(dx*dx + dy*dy)
-            
-            if dist > 0:
-                # Movement towards center + some randomness
-                point['x'] += (dx/dist * 0.15 + point['direction'])
-                point['y'] += (dy/dist * 0.15 + point['direction'])
-            
-            point['life'] -= 0.7  # Decrease lifetime more quickly
+        # Movement towards module center + some randomness
+        centers = self.centers[points.module[:len(points)]]
+        points.move_towards(centers[:, 0], centers[:, 1], 0.15)
+        points.life[:len(points)] -= 0.7  # Decrease lifetime more quickly
     
-    def update(self, audio_data):
-        self.update_movement_points(audio_data)
+    def update(self, ctx):
+        self.update_movement_points(ctx.features)
+        
+        # Intensity with steeper falloff inside a reduced influence area
+        points = self.movement_points
+        count = len(points)
+        weights = (points.life[:count] / 12) * points.intensity[:count]
+        total_intensity = points.rasterize(self.darkening, weights, 1.2, 1.2)
         
         # First define all pixels as light gray
-        for i in range(len(self.display.pixels)):
-            self.display.pixels[i] = (40, 40, 40)  # Same gray as NegativeWave
+        self.display.frame[:] = (40, 40, 40)  # Same gray as NegativeWave
         
         for module in range(self.display.num_modules):
-            base = module * (self.display.width * self.display.height)
+            frame = self.display.module_frame(module)
+            moving = total_intensity[module] > 0
             
-            for x in range(self.display.width):
-                for y in range(self.display.height):
-                    # Calculate index based on snake profile
-                    if module == 0:
-                        index = base + x * self.display.height + (self.display.height - 1 - y)
-                    else:
-                        index = base + (self.display.width - 1 - x) * self.display.height + y
-                    
-                    # Check if there are nearby movement points
-                    total_intensity = 0
-                    for point in self.movement_points:
-                        if point['module'] == module:
-                            dx = point['x'] - x
-                            dy = point['y'] - y
-                            dist = math.sqrt(dx*dx + dy*dy)
-                            
-                            if dist < 1.2:  # Reduce influence area
-                                # Calculate intensity with steeper falloff
-                                intensity = (1 - dist/1.2) * (point['life']/12) * point['intensity']
-                                total_intensity = max(total_intensity, intensity)
-                    
-                    if total_intensity > 0:
-                        # Adjust darkening curve
-                        darkness = min(1.0, total_intensity * 0.6)  # Reduces darkening factor
-                        # Interpolate between light gray (40) and black (0)
-                        color_value = int(40 * (1 - darkness))
-                        self.display.pixels[index] = (color_value, color_value, color_value)
+            # Adjust darkening curve
+            darkness = np.minimum(1.0, total_intensity[module][moving] * 0.6)  # Reduces darkening factor
+            # Interpolate between light gray (40) and black (0)
+            color_value = (40 * (1 - darkness)).astype(np.uint8)
+            frame[moving] = color_value[:, None]
         
         self.display.show() 
-
-# Check if pixel is part of center cross symbol 
\ No newline at end of file
@@ -1,28 +1,15 @@
 from src.base import BaseEffect
+from src.render.bars import BarCompositor
 
 class NegativeWave(BaseEffect):
     """Wave effect with inverted colors - light gray background with dark activity"""
+    name = "NegativeWave"
+    static = True
+
+    def __init__(self, display, audio):
+        super().__init__(display, audio)
+        self.bars = BarCompositor(display.panel_height, display.panel_width, fill=(0, 0, 0), background=(40, 40, 40))
     
-    @property
-    def name(self):
-        return "NegativeWave"
-    
-    def update(self, audio_data):
-        for module in range(self.display.num_modules):
-            base = module * self.display.width * self.display.height
-            
-            # Processa dados do módulo atual
-            module_data = audio_data[module * self.display.width:(module + 1) * self.display.width]
-            
-            for x in range(self.display.width):
-                value = module_data[x]
-                
-                for y in range(self.display.height):
-                    if module == 0:
-                        index = base + x * self.display.height + (self.display.height - 1 - y)
-                    else:
-                        index = base + (self.display.width - 1 - x) * self.display.height + y
-                    
-                    self.display.pixels[index] = (0, 0, 0) if y < value else (40, 40, 40)
-        
-        self.display.show() 
\ No newline at end of file
+    def update(self, ctx):
+        self.bars.render(self.display.frame, self.columns(ctx.bars))
+        self.display.show()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
-from src.base import EffectManager, Logger
+from src.base import EffectManager, Logger, set_seed
 from src.processor.cava_manager import CAVAManager
+from src.processor.analyzer import SpectrumAnalyzer
+from src.processor.replay import ReplaySource
 from src.__version__ import __version__, __author__, __copyright__
 import argparse
 import os
@@ -16,26 +18,37 @@ def main():
     parser = argparse.ArgumentParser(description='LED effects controller')
     parser.add_argument('--version', '-v', action='version', version=f'LEDCAVA-WS2812 {__version__}')
     parser.add_argument('--effect', type=str, help='Name of the effect to start (ex: BlueWave, WarmPeaks, etc)')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible effects (overrides effects.seed)')
+    parser.add_argument('--latency', action='store_true', help='Log audio-to-LED latency percentiles (audio_age metrics stage)')
     args = parser.parse_args()
+    if args.seed is not None and args.seed < 0:
+        parser.error('--seed must be a non-negative integer')
 
     os.nice(-20)
 
     manager = EffectManager()
-    cava = CAVAManager()
+    backend = manager.config['audio'].get('backend', 'cava')
+    if backend == 'numpy':
+        cava = SpectrumAnalyzer()
+    elif backend == 'replay':
+        cava = ReplaySource()
+    else:
+        cava = CAVAManager()
+    if args.seed is not None:
+        set_seed(args.seed)
+    if args.latency:
+        manager.enable_metrics(['audio_age'])
 
     manager.set_cava_manager(cava)
 
     if args.effect:
-        for i, effect_class in enumerate(manager.effects):
-            effect = effect_class(manager.display, None)
-            if effect.name == args.effect:
-                Logger.info(f"Starting effect: {args.effect}")
-                manager.current_effect = i
-                manager.auto_cycle = False
-                break
-        else:
+        index = manager.find_effect(args.effect)
+        if index is None:
             Logger.error(f"Effect not found: {args.effect}")
             return
+        Logger.info(f"Starting effect: {args.effect}")
+        manager.current_effect = index
+        manager.auto_cycle = False
 
     try:
         manager.run()
@@ -1,7 +1,17 @@
 import os
 import time
 import json
-from rpi_ws281x import PixelStrip, Color
+import threading
+import zlib
+from collections import namedtuple
+import numpy as np
+from src import color
+from src.display.correction import ColorCorrection
+from src.display.topology import PanelLayout
+from src.display.transform import OutputTransform
+from src.output.base import create_backend
+from src.recording import RecordingWriter
+from src.render.context import Clock
 
 class Logger:
     COLORS = {
@@ -26,7 +36,8 @@ class Logger:
         Logger.log('ERROR', message)
 
 class DisplayController:
-    def __init__(self, brightness, num_pixels, module_width, module_height, num_modules, gpio_pin):
+    def __init__(self, brightness, num_pixels, module_width, module_height, num_modules, gpio_pin, layout=None,
+                 output=None, correction=None, async_output=False):
         self.width = module_width
         self.height = module_height
         self.num_modules = num_modules
@@ -37,113 +48,393 @@ class DisplayController:
             raise ValueError("Total number of pixels does not match module dimensions")
         if not 0 < brightness <= 1:
             raise ValueError("Brightness must be between 0 and 1")
-        self.indices = {}
-        for module in range(self.num_modules):
-            base = module * (self.width * self.height)
-            for x in range(self.width):
-                for y in range(self.height):
-                    if module == 0:
-                        index = base + x * self.height + (self.height - 1 - y)
-                    else:
-                        index = base + (self.width - 1 - x) * self.height + y
-                    self.indices[(x, y, module)] = index
-        LED_FREQ_HZ = 800000
-        LED_DMA = 10
-        LED_INVERT = False
-        LED_CHANNEL = 0
-        self.strip = PixelStrip(num_pixels, gpio_pin, LED_FREQ_HZ, LED_DMA, LED_INVERT, int(brightness * 255), LED_CHANNEL)
-        self.strip.begin()
+        if layout is None:
+            layout = PanelLayout(module_width, module_height, num_modules)
+        self.panel_width = layout.width
+        self.panel_height = layout.height
+        self.origins = [layout.origin(module) for module in range(self.num_modules)]
+        self.layout_permutation = layout.compile()
+        self.permutation = self.layout_permutation
+        # Logical framebuffer, frame[y, x] with y = 0 on the bottom row. show()
+        # gathers it into strip order through the compiled layout permutation.
+        self.frame = np.zeros((self.panel_height, self.panel_width, 3), dtype=np.uint8)
+        self.flat = self.frame.reshape(-1, 3)
+        self.strip_frame = np.zeros((self.num_pixels, 3), dtype=np.uint8)
+        # With a correction stage brightness is applied in its tables, where
+        # dithering keeps dim levels that the hardware scaling would crush
+        self.correction = correction
+        if output is None:
+            from src.output.ws281x import Ws281xBackend
+            output = Ws281xBackend(num_pixels, gpio_pin, 1.0 if correction is not None else brightness)
+        self.output = output
+        self.output.begin()
+        self.closed = False
+        self.metrics = None
+        # Seconds the render thread spent in show(), kept out of the render stage
+        self.show_time = 0.0
+        # Optional RecordingWriter; the render loop sets audio_frame to the
+        # frame it acquired, stored with each recorded frame
+        self.recorder = None
+        self.audio_frame = None
         self.pixels = self
+        self.output_thread = None
+        if async_output:
+            # show() fills the back buffer and hands it over; the output
+            # thread pushes the front buffer while the next frame renders
+            self.front_frame = np.zeros_like(self.strip_frame)
+            self.output_ready = threading.Condition()
+            self.frame_pending = False
+            self.running = True
+            self.dropped_frames = 0
+            self.output_thread = threading.Thread(target=self._output_loop, name='display-output', daemon=True)
+            self.output_thread.start()
+
+    def _pack(self):
+        np.take(self.flat, self.permutation, axis=0, out=self.strip_frame)
+        if self.correction is not None:
+            self.correction.apply(self.strip_frame)
+        if self.recorder is not None:
+            frame = self.audio_frame
+            if frame is not None:
+                self.recorder.write(time.time(), frame.levels, frame.spectrum, self.strip_frame)
+            else:
+                self.recorder.write(time.time(), rgb=self.strip_frame)
 
     def clear(self):
-        for i in range(self.num_pixels):
-            self.strip.setPixelColor(i, Color(0, 0, 0))
-        self.strip.show()
+        self.frame.fill(0)
+        self.show()
+
+    def set_transform(self, transform):
+        """Shows the following frames through an OutputTransform, None for none."""
+        if transform is None:
+            self.permutation = self.layout_permutation
+            return
+        source = transform.compile(self.panel_width, self.panel_height, self.origins, self.width, self.height)
+        self.permutation = source[self.layout_permutation]
+
+    def module_frame(self, module):
+        x0, y0 = self.origins[module]
+        return self.frame[y0:y0 + self.height, x0:x0 + self.width]
 
     def set_pixel(self, x, y, color, module):
         if 0 <= x < self.width and 0 <= y < self.height:
-            index = self.indices.get((x, y, module))
-            if index is None:
+            if not 0 <= module < self.num_modules:
                 raise ValueError("Invalid index")
-            r, g, b = color
-            self.strip.setPixelColor(index, Color(r, g, b))
-    
+            x0, y0 = self.origins[module]
+            self.frame[y0 + y, x0 + x] = color
+
     def show(self):
-        self.strip.show()
-    
+        if self.closed:
+            return
+        if self.metrics is not None:
+            start = time.monotonic()
+        if self.output_thread is not None:
+            self._pack()
+            with self.output_ready:
+                if self.frame_pending:
+                    # Drop the oldest frame: the strip only ever gets the newest one
+                    self.dropped_frames += 1
+                    if self.metrics is not None:
+                        self.metrics.record_output_drop()
+                self.strip_frame, self.front_frame = self.front_frame, self.strip_frame
+                self.frame_pending = True
+                self.output_ready.notify()
+            if self.metrics is not None:
+                self.show_time += time.monotonic() - start
+            return
+        self._pack()
+        self.output.write(self.strip_frame)
+        self.output.show()
+        if self.metrics is not None:
+            elapsed = time.monotonic() - start
+            self.show_time += elapsed
+            self.metrics.record('show', elapsed)
+
+    def _output_loop(self):
+        while True:
+            with self.output_ready:
+                while self.running and not self.frame_pending:
+                    self.output_ready.wait()
+                if not self.frame_pending:
+                    return
+                start = time.monotonic()
+                # Copied under the lock, so show() can swap buffers as soon as it is released
+                self.output.write(self.front_frame)
+                self.frame_pending = False
+            self.output.show()
+            if self.metrics is not None:
+                self.metrics.record('show', time.monotonic() - start)
+
+    def close(self):
+        """Pushes the pending frame, stops the output thread and closes the backend."""
+        if self.closed:
+            return
+        if self.output_thread is not None:
+            with self.output_ready:
+                self.running = False
+                self.output_ready.notify()
+            self.output_thread.join()
+            self.output_thread = None
+        self.output.close()
+        self.closed = True
+
     def __setitem__(self, index, color):
-        r, g, b = color
-        self.strip.setPixelColor(index, Color(r, g, b))
-    
+        self.flat[self.permutation[index]] = color
+
     def __getitem__(self, index):
-        return None
-    
+        return tuple(int(c) for c in self.flat[self.permutation[index]])
+
     def __len__(self):
         return self.num_pixels
 
+# Effect classes by name, filled as effect modules are imported
+EFFECTS = {}
+
+# Global random seed, None for a fresh OS seed per effect
+_seed = None
+
+def set_seed(seed):
+    global _seed
+    _seed = seed
+
+def effect_rng(name):
+    """Random generator of an effect: the same sequence on every run for a given global seed."""
+    if _seed is None:
+        return np.random.default_rng()
+    return np.random.default_rng([_seed, zlib.crc32(name.encode())])
+
+# transform: OutputTransform of a configured variant, None for the effect as drawn
+EffectInfo = namedtuple('EffectInfo', 'name module class_name transform', defaults=(None,))
+
 class BaseEffect:
+    # Name in settings.json and --effect, the class name unless set
+    name = None
+    # Frame depends only on the audio frame: the render loop skips it until a
+    # new one arrives
+    static = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not isinstance(cls.__dict__.get('name'), str):
+            cls.name = cls.__name__
+        EFFECTS[cls.name] = cls
+
     def __init__(self, display, audio):
         self.display = display
         self.audio = audio
-        self.last_update = time.time()
+        # All randomness of the effect, drawn in batches
+        self.rng = effect_rng(self.name)
+
+    def columns(self, audio_data):
+        """Spreads the audio bars across the logical panel columns."""
+        data = np.asarray(audio_data)
+        width = self.display.panel_width
+        if len(data) == width:
+            return data
+        return data[np.arange(width) * len(data) // width]
 
-    @property
-    def name(self):
-        return self.__class__.__name__
+    def module_data(self, audio_data, module):
+        """Audio values of the columns covered by a module."""
+        x0 = self.display.origins[module][0]
+        return self.columns(audio_data)[x0:x0 + self.display.width]
 
-    def update(self, audio_data):
+    def rotated_module(self, module):
+        """Top-down view of a module for the effects drawn rotated towards the seam."""
+        return np.rot90(self.display.module_frame(module), -1 if module == 0 else 1)
+
+    def update(self, ctx):
+        """Draws one frame from a FrameContext (src/render/context.py)."""
         raise NotImplementedError
 
+def write_json(path, data):
+    """Replaces a JSON file atomically, so readers never see it half written."""
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(data, f, indent=4)
+    os.replace(temp_file, path)
+
+def _scan_effect_module(path):
+    """[name, class name] of the effects a module declares, read from its source."""
+    import ast
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), path)
+    bases = {'BaseEffect'}
+    found = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        if not any(isinstance(base, ast.Name) and base.id in bases for base in node.bases):
+            continue
+        bases.add(node.name)
+        name = node.name
+        for item in node.body:
+            if (isinstance(item, ast.Assign) and len(item.targets) == 1
+                    and isinstance(item.targets[0], ast.Name) and item.targets[0].id == 'name'
+                    and isinstance(item.value, ast.Constant) and isinstance(item.value.value, str)):
+                name = item.value.value
+        found.append([name, node.name])
+    return found
+
+def discover_effects():
+    """
+    Effects of the effects package as EffectInfo, found by parsing the modules
+    instead of importing them. Results are cached per module by modification
+    time in effects/.registry.json.
+    """
+    import pkgutil
+    import effects
+    effects_path = os.path.dirname(effects.__file__)
+    cache_file = os.path.join(effects_path, '.registry.json')
+    try:
+        with open(cache_file, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    modules = {}
+    found = []
+    for _, module, is_package in pkgutil.iter_modules([effects_path]):
+        if is_package:
+            continue
+        path = os.path.join(effects_path, f'{module}.py')
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            entry = cache.get(module)
+            if not isinstance(entry, dict) or entry.get('mtime') != mtime:
+                entry = {'mtime': mtime, 'effects': _scan_effect_module(path)}
+        except (OSError, SyntaxError, ValueError) as e:
+            Logger.error(f"Error loading effect {module}: {str(e)}")
+            continue
+        modules[module] = entry
+        found.extend(EffectInfo(name, f'effects.{module}', class_name) for name, class_name in entry['effects'])
+    if modules != cache:
+        try:
+            write_json(cache_file, modules)
+        except OSError:
+            pass
+    return found
+
+def load_effect(info):
+    """Imports the module of a discovered effect and returns its class."""
+    import importlib
+    # By class: variants are listed under their own name
+    effect_class = getattr(importlib.import_module(info.module), info.class_name)
+    if info.name == effect_class.name:
+        return effect_class
+    # A variant is a subclass named after it, so its random stream is its own
+    variant = EFFECTS.get(info.name)
+    if variant is None or variant.__bases__ != (effect_class,):
+        variant = type(info.name, (effect_class,), {'name': info.name, '__module__': effect_class.__module__})
+    return variant
+
 class EffectManager:
     def __init__(self):
         with open('settings.json', 'r') as f:
             self.config = json.load(f)
         display_config = self.config['display']
         gpio_pin = display_config.get('gpio_pin', 18)
+        correction = ColorCorrection.from_config(display_config)
         self.display = DisplayController(
             brightness=display_config['brightness'],
             num_pixels=display_config['num_pixels'],
             module_width=display_config['module_width'],
             module_height=display_config['module_height'],
             num_modules=display_config['num_modules'],
-            gpio_pin=gpio_pin
+            gpio_pin=gpio_pin,
+            layout=PanelLayout.from_config(display_config),
+            output=create_backend(display_config, 1.0 if correction is not None else display_config['brightness']),
+            correction=correction,
+            async_output=display_config.get('async_output', False)
         )
         self.effects = []
         self.current_effect = 0
         self.last_effect_change = time.time()
         self.cava = None
+        self.features = None
+        self.recording = self.config.get('recording', {})
+        if self.recording.get('queue', 256) <= 0:
+            raise ValueError("Invalid recording settings")
         self.auto_cycle = self.config['effects']['auto_cycle']
         self.effect_duration = self.config['effects']['duration']
+        seed = self.config['effects'].get('seed')
+        if seed is not None and (not isinstance(seed, int) or seed < 0):
+            raise ValueError("Invalid effects seed")
+        set_seed(seed)
+        render_config = self.config.get('render', {})
+        self.scheduler = render_config.get('scheduler', 'event')
+        self.render_framerate = render_config.get('framerate', 60)
+        self.max_wait = render_config.get('max_wait', 0.1)
+        if self.scheduler not in ('event', 'fixed') or self.render_framerate <= 0 or self.max_wait <= 0:
+            raise ValueError("Invalid render settings")
+        stale_config = self.config['audio'].get('stale', {})
+        self.stale_timeout = stale_config.get('timeout', 0.5)
+        self.stale_policy = stale_config.get('policy', 'decay')
+        self.stale_decay = stale_config.get('decay', 0.3)
+        if self.stale_policy not in ('hold', 'decay', 'idle') or self.stale_timeout <= 0:
+            raise ValueError("Invalid stale audio settings")
+        self.decayed_frame = None
+        self.clock = Clock()
+        from src.metrics import FrameMetrics
+        self.metrics = FrameMetrics.from_config(self.config.get('metrics', {}), 1 / self.render_framerate)
+        self.display.metrics = self.metrics
+        color.configure(self.config.get('palettes', {}))
         self.load_effects()
 
     def load_effects(self):
-        import importlib
-        import inspect
-        import pkgutil
-        import effects
-        effects_path = os.path.dirname(effects.__file__)
-        if 'enabled' not in self.config['effects']:
-            self.config['effects']['enabled'] = {}
-        for _, name, _ in pkgutil.iter_modules([effects_path]):
-            if name != '__init__':
-                try:
-                    module = importlib.import_module(f'effects.{name}')
-                    for item_name, item in inspect.getmembers(module):
-                        if (inspect.isclass(item) and issubclass(item, BaseEffect) and item != BaseEffect):
-                            temp_instance = item(self.display, None)
-                            effect_name = temp_instance.name
-                            if effect_name not in self.config['effects']['enabled']:
-                                self.config['effects']['enabled'][effect_name] = True
-                                with open('settings.json', 'w') as f:
-                                    json.dump(self.config, f, indent=4)
-                            if self.config['effects']['enabled'].get(effect_name, True):
-                                self.effects.append(item)
-                                Logger.info(f"Effect auto-loaded: {effect_name}")
-                except Exception as e:
-                    Logger.error(f"Error loading effect {name}: {str(e)}")
+        enabled = self.config['effects'].setdefault('enabled', {})
+        infos = discover_effects()
+        by_name = {info.name: info for info in infos}
+        # Variants draw an effect through an output transform; an entry named
+        # after its own effect transforms that effect in place
+        for name, variant in self.config['effects'].get('variants', {}).items():
+            base = by_name.get(variant.get('effect', name))
+            if base is None:
+                Logger.error(f"Effect not found for variant {name}: {variant.get('effect', name)}")
+                continue
+            info = base._replace(name=name, transform=OutputTransform.from_config(variant.get('transform')))
+            if name in by_name:
+                infos[infos.index(by_name[name])] = info
+            else:
+                # Right after the other entries of the same effect in the cycle
+                position = max(i for i, other in enumerate(infos) if other.module == base.module) + 1
+                infos.insert(position, info)
+            by_name[name] = info
+        added = False
+        for info in infos:
+            if info.name not in enabled:
+                enabled[info.name] = True
+                added = True
+            if enabled.get(info.name, True):
+                self.effects.append(info)
+                Logger.info(f"Effect auto-loaded: {info.name}")
+        if added:
+            write_json('settings.json', self.config)
+
+    def enable_metrics(self, stages):
+        if self.metrics is None:
+            from src.metrics import FrameMetrics
+            self.metrics = FrameMetrics(stages=stages, budget=1 / self.render_framerate)
+            self.display.metrics = self.metrics
+            if self.cava:
+                self.cava.metrics = self.metrics
+        else:
+            for stage in stages:
+                self.metrics.enable(stage)
 
     def set_cava_manager(self, cava):
+        from src.processor.features import AudioFeatures
+        from src.processor.source import DecayedFrame
         self.cava = cava
+        cava.metrics = self.metrics
+        self.decayed_frame = DecayedFrame(cava.bars, self.stale_decay)
+        self.features = AudioFeatures.from_config(self.config.get('features', {}), cava.bars, self.display,
+                                                  self.config['audio'].get('framerate', 60))
+        queue = self.recording.get('queue', 256)
+        if self.recording.get('audio'):
+            cava.recorder = RecordingWriter(self.recording['audio'], cava.bars, 0, queue)
+            Logger.info(f"Recording audio frames to {self.recording['audio']}")
+        if self.recording.get('display'):
+            self.display.recorder = RecordingWriter(self.recording['display'], cava.bars, self.display.num_pixels, queue)
+            Logger.info(f"Recording display frames to {self.recording['display']}")
 
     def next_effect(self):
         if self.effects:
@@ -156,20 +447,108 @@ class EffectManager:
             return
         self.cava.start()
         current_effect = None
+        sequence = 0
+        frame_interval = 1 / self.render_framerate
+        next_frame = time.monotonic()
+        metrics = self.metrics
+        last_sequence = 0
+        feature_sequence = None
+        rendered_sequence = None
+        stale = False
+        idle = False
+        decaying = False
+        started = next_frame
+        last_frame = next_frame
         Logger.info("System ready - Press Ctrl+C to exit")
         try:
             while True:
+                if self.scheduler == 'event':
+                    # Wake on the next audio frame; the deadline keeps time-based
+                    # animations moving if the audio source stalls, and paces the
+                    # fade of stale bars
+                    timeout = frame_interval if decaying else self.max_wait
+                    sequence = self.cava.wait_for_frame(sequence, timeout)
+                else:
+                    next_frame += frame_interval
+                    delay = next_frame - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    elif delay < -frame_interval:
+                        # Fell behind by more than a tick: resync instead of bursting
+                        next_frame = time.monotonic()
                 current_time = time.time()
                 if self.auto_cycle and current_time - self.last_effect_change >= self.effect_duration:
                     self.next_effect()
                     current_effect = None
                 if current_effect is None:
-                    effect_class = self.effects[self.current_effect]
-                    current_effect = effect_class(self.display, self.cava)
+                    info = self.effects[self.current_effect]
+                    try:
+                        current_effect = load_effect(info)(self.display, self.cava)
+                        self.display.set_transform(info.transform)
+                    except Exception as e:
+                        Logger.error(f"Error loading effect {info.name}: {str(e)}")
+                        del self.effects[self.current_effect]
+                        if not self.effects:
+                            Logger.error("No effects enabled")
+                            return
+                        self.current_effect %= len(self.effects)
+                        continue
+                    rendered_sequence = None
+                    if metrics:
+                        metrics.label = current_effect.name
                 if self.cava:
-                    audio_data = self.cava.get_data()
-                    current_effect.update(audio_data)
-                time.sleep(1/60)
+                    # The only acquire of the tick: the slot stays ours until the next
+                    # acquire, so the frame is valid through update() and the display's
+                    # recording
+                    frame = self.cava.latest()
+                    self.display.audio_frame = frame
+                    now = time.monotonic()
+                    age = now - (frame.time or started)
+                    decaying = False
+                    if age > self.stale_timeout:
+                        if not stale:
+                            stale = True
+                            Logger.warn(f"No audio frames for {age:.1f} s - stale policy: {self.stale_policy}")
+                        if self.stale_policy == 'idle':
+                            if not idle:
+                                idle = True
+                                self.display.clear()
+                            continue
+                        if self.stale_policy == 'decay':
+                            frame = self.decayed_frame.update(frame, age - self.stale_timeout, now)
+                            self.display.audio_frame = frame
+                            decaying = not self.decayed_frame.faded
+                    elif stale:
+                        stale = idle = False
+                        rendered_sequence = None
+                        Logger.info(f"Audio input resumed ({self.cava.input_rate:.0f} fps)")
+                    audio_data = frame.levels
+                    if frame.sequence != feature_sequence or decaying:
+                        # Once per audio frame, however many frames render from it
+                        feature_sequence = frame.sequence
+                        self.features.update(audio_data, frame.spectrum, frame.time, frame.smoothed, frame.peaks)
+                    if current_effect.static and frame.sequence == rendered_sequence and not decaying:
+                        # Nothing new to draw: the LEDs already show this frame
+                        continue
+                    rendered_sequence = frame.sequence
+                    ctx = self.clock.tick(audio_data, frame.sequence, self.features, now)
+                    if metrics is None:
+                        current_effect.update(ctx)
+                        continue
+                    self.display.show_time = 0.0
+                    start = time.monotonic()
+                    current_effect.update(ctx)
+                    now = time.monotonic()
+                    # The push to the strip is the 'show' stage, not the effect's
+                    metrics.record('render', now - start - self.display.show_time, now)
+                    metrics.record('frame', now - last_frame, now)
+                    last_frame = now
+                    if frame.time and not decaying:
+                        # Audio capture to LED push, measured after show()
+                        metrics.record('audio_age', now - frame.time, now)
+                        metrics.record_audio_frame(frame.sequence, last_sequence)
+                        last_sequence = frame.sequence
+                    metrics.tick(now)
         except KeyboardInterrupt:
             Logger.info("\nShutting down...")
         finally:
@@ -179,11 +558,23 @@ class EffectManager:
         if self.cava:
             self.cava.stop()
         self.display.clear()
+        self.display.close()
+        for recorder in (getattr(self.cava, 'recorder', None), self.display.recorder):
+            if recorder is not None:
+                recorder.close()
+                if recorder.dropped:
+                    Logger.warn(f"{recorder.path}: {recorder.dropped} frames dropped by the recorder")
         Logger.info("System stopped")
 
+    def find_effect(self, name):
+        """Index of an enabled effect in the cycle, None if there is no such effect."""
+        for i, info in enumerate(self.effects):
+            if info.name == name:
+                return i
+        return None
+
     def get_effect_by_name(self, name):
-        for effect_class in self.effects:
-            effect = effect_class(self.display, self.cava)
-            if effect.name == name:
-                return effect_class
-        return None 
\ No newline at end of file
+        index = self.find_effect(name)
+        if index is None:
+            return None
+        return load_effect(self.effects[index]) 
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+Headless effect benchmark.
+
+Runs every discovered effect against the null output backend, feeding a
+deterministic synthetic spectrum or the audio frames of a recording, and
+reports the cost per frame:
+
+    python3 -m src.bench --geometry 8x8x2 --geometry 32x32x8@4x2 --output bench.json
+    python3 -m src.bench --baseline bench.json --threshold 0.2
+    python3 -m src.bench --replay capture.ledr
+
+Geometries are MODULE_WIDTHxMODULE_HEIGHTxMODULES, optionally followed by
+@COLUMNSxROWS for the module grid (default: one row).
+"""
+import argparse
+import json
+import math
+import platform
+import re
+import sys
+import time
+import tracemalloc
+import zlib
+import numpy as np
+from src.base import DisplayController, Logger, discover_effects, load_effect, set_seed
+from src.display.topology import PanelLayout
+from src.output.null import NullBackend
+from src.processor.features import AudioFeatures
+from src.processor.smoothing import SpectrumSmoother
+from src.recording import Recording
+from src.render.context import VirtualClock
+
+DEFAULT_GEOMETRIES = ('8x8x2', '16x16x4@2x2', '32x32x8@4x2')
+
+class RecordingBackend(NullBackend):
+    """Keeps a running CRC32 of every frame pushed, to compare renders between runs."""
+
+    def __init__(self, num_pixels):
+        super().__init__(num_pixels)
+        self.checksum = 0
+
+    def show(self):
+        super().show()
+        self.checksum = zlib.crc32(self.pixels.tobytes(), self.checksum)
+
+def parse_geometry(text):
+    match = re.fullmatch(r'(\d+)x(\d+)x(\d+)(?:@(\d+)x(\d+))?', text)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid geometry: {text}")
+    width, height, modules = (int(v) for v in match.group(1, 2, 3))
+    columns = int(match.group(4)) if match.group(4) else modules
+    rows = int(match.group(5)) if match.group(5) else 1
+    return text, PanelLayout(width, height, modules, columns=columns, rows=rows)
+
+def synthetic_spectrum(frame, bars):
+    """Deterministic 0-8 levels: a sweeping peak over a pulsing bass."""
+    t = frame / 60.0
+    center = (math.sin(t * 0.7) * 0.5 + 0.5) * (bars - 1)
+    bass = math.sin(t * 2 * math.pi * 2) * 0.5 + 0.5
+    values = []
+    for i in range(bars):
+        sweep = math.exp(-((i - center) ** 2) / 4.0)
+        tilt = bass * max(0.0, 1.0 - i / (bars / 3))
+        values.append(min(8, int(min(1.0, sweep * 0.8 + tilt * 0.6) * 8)))
+    return values
+
+def create_display(layout, backend_class=RecordingBackend):
+    num_pixels = layout.module_width * layout.module_height * layout.num_modules
+    return DisplayController(
+        brightness=1.0,
+        num_pixels=num_pixels,
+        module_width=layout.module_width,
+        module_height=layout.module_height,
+        num_modules=layout.num_modules,
+        gpio_pin=None,
+        layout=layout,
+        output=backend_class(num_pixels)
+    )
+
+def bench_effect(effect_class, layout, spectrum, frames, warmup):
+    display = create_display(layout)
+    effect = effect_class(display, None)
+    features = AudioFeatures(len(spectrum[0]), display)
+    smoother = SpectrumSmoother(len(spectrum[0]))
+    # Virtual time: animations advance 1/60 s per frame however fast they render
+    clock = VirtualClock(60)
+
+    def next_frame(i):
+        # Shared per audio frame in the render loop, so outside the effect timings
+        audio_data = spectrum[i % len(spectrum)]
+        ctx = clock.tick(audio_data, i + 1, features)
+        bars = np.asarray(audio_data, dtype=np.float32) / 8
+        smoother.update(bars, ctx.t)
+        features.update(audio_data, bars, ctx.t, smoother.smoothed, smoother.peaks)
+        return ctx
+
+    for i in range(warmup):
+        effect.update(next_frame(i))
+    durations = np.empty(frames)
+    for i in range(frames):
+        ctx = next_frame(i)
+        start = time.perf_counter()
+        effect.update(ctx)
+        durations[i] = time.perf_counter() - start
+    # Separate pass under tracemalloc, which would distort the timings
+    tracemalloc.start()
+    peaks = []
+    for i in range(min(frames, 50)):
+        ctx = next_frame(i)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        effect.update(ctx)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    mean = float(durations.mean())
+    return effect.name, {
+        'us_per_frame': mean * 1e6,
+        'p95_us': float(np.percentile(durations, 95)) * 1e6,
+        'fps': 1.0 / mean if mean > 0 else float('inf'),
+        'alloc_bytes_per_frame': int(np.median(peaks)),
+        'checksum': display.output.checksum
+    }
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for geometry, effects in results.items():
+        for name, result in effects.items():
+            previous = baseline.get('results', {}).get(geometry, {}).get(name)
+            if not previous or 'us_per_frame' not in result or 'us_per_frame' not in previous:
+                continue
+            ratio = result['us_per_frame'] / previous['us_per_frame'] - 1
+            if ratio > threshold:
+                regressions.append((geometry, name, previous['us_per_frame'], result['us_per_frame'], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless LED effect benchmark')
+    parser.add_argument('--geometry', action='append', type=parse_geometry,
+                        help='Panel geometry, e.g. 8x8x2 or 32x32x8@4x2 (repeatable)')
+    parser.add_argument('--effect', action='append', help='Only benchmark this effect (repeatable)')
+    parser.add_argument('--frames', type=int, default=120, help='Timed frames per effect')
+    parser.add_argument('--warmup', type=int, default=30, help='Untimed frames before measuring')
+    parser.add_argument('--bars', type=int, default=16, help='Number of synthetic audio bars')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the effects (default 0)')
+    parser.add_argument('--replay', help='Feed the audio frames of this recording instead of the synthetic spectrum')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--baseline', help='Previous JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Fail when an effect is this fraction slower than the baseline')
+    args = parser.parse_args(argv)
+
+    if args.seed < 0:
+        parser.error('--seed must be a non-negative integer')
+    # Every effect starts from the same random state on every run
+    set_seed(args.seed)
+    geometries = args.geometry or [parse_geometry(g) for g in DEFAULT_GEOMETRIES]
+    if args.replay:
+        recording = Recording(args.replay)
+        if not recording.bars or not len(recording):
+            Logger.error(f"Recording has no audio frames: {args.replay}")
+            return 1
+        spectrum = recording.records['levels'].tolist()
+        args.bars = recording.bars
+        recording.close()
+    else:
+        spectrum = [synthetic_spectrum(i, args.bars) for i in range(600)]
+    # Only the selected effects are imported
+    effect_infos = [info for info in discover_effects() if not args.effect or info.name in args.effect]
+    results = {}
+    for geometry, layout in geometries:
+        results[geometry] = {}
+        print(f"\n{geometry} ({layout.width}x{layout.height} px)")
+        for info in effect_infos:
+            try:
+                name, result = bench_effect(load_effect(info), layout, spectrum, args.frames, args.warmup)
+            except Exception as e:
+                name, result = info.name, {'error': str(e)}
+            results[geometry][name] = result
+            if 'error' in result:
+                print(f"  {name:<22} error: {result['error']}")
+            else:
+                print(f"  {name:<22} {result['us_per_frame']:>10.1f} us/frame  {result['fps']:>9.1f} fps  "
+                      f"{result['alloc_bytes_per_frame']:>8d} B/frame")
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'frames': args.frames,
+            'bars': args.bars,
+            'replay': args.replay
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for geometry, name, before, after, ratio in regressions:
+            Logger.error(f"{geometry} {name}: {before:.1f} -> {after:.1f} us/frame (+{ratio * 100:.0f}%)")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
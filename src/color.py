@@ -0,0 +1,122 @@
+import numpy as np
+
+HUE_TABLE_SIZE = 1024
+
+_definitions = {}
+_palettes = {}
+_hue_table = None
+
+def hsv_to_rgb(h, s, v):
+    """Vectorized colorsys.hsv_to_rgb: arrays in 0-1, returns (..., 3) floats in 0-1."""
+    h, s, v = np.broadcast_arrays(*(np.asarray(c, dtype=float) for c in (h, s, v)))
+    i = (h * 6.0).astype(int)
+    f = h * 6.0 - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i %= 6
+    r = np.choose(i, (v, q, p, p, t, v))
+    g = np.choose(i, (t, v, v, q, p, p))
+    b = np.choose(i, (p, p, t, v, v, q))
+    return np.stack((r, g, b), axis=-1)
+
+def hue_table():
+    """Fully saturated, full value RGB for HUE_TABLE_SIZE hues, built once."""
+    global _hue_table
+    if _hue_table is None:
+        hues = np.arange(HUE_TABLE_SIZE) / HUE_TABLE_SIZE
+        _hue_table = hsv_to_rgb(hues, 1.0, 1.0)
+    return _hue_table
+
+def hsv_lookup(h, s, v):
+    """
+    HSV to 8-bit RGB through the hue table. Every HSV channel is
+    v * (1 - s * (1 - pure hue channel)), so only the hue needs a lookup.
+    """
+    h = np.asarray(h)
+    index = (h * HUE_TABLE_SIZE).astype(int) % HUE_TABLE_SIZE
+    pure = hue_table()[index]
+    s = np.asarray(s, dtype=float)[..., None]
+    v = np.asarray(v, dtype=float)[..., None]
+    return (v * (1.0 - s * (1.0 - pure)) * 255).astype(np.uint8)
+
+class Palette:
+    """Precompiled color table mapping values in [0, limit] to 8-bit RGB."""
+
+    def __init__(self, table, limit=1.0):
+        self.table = np.ascontiguousarray(table, dtype=np.uint8)
+        self.size = len(self.table)
+        self.limit = limit
+        self.scale = (self.size - 1) / limit
+
+    @classmethod
+    def from_stops(cls, stops, size=256, limit=1.0):
+        """
+        Linear ramp through [position, [r, g, b]] stops. Two stops at the same
+        position make a hard step.
+        """
+        positions = np.arange(size) * limit / (size - 1)
+        table = np.zeros((size, 3))
+        table[:] = stops[0][1]
+        for (start, color), (end, next_color) in zip(stops, stops[1:]):
+            if end <= start:
+                continue
+            segment = (positions >= start) & (positions < end)
+            ratio = ((positions[segment] - start) / (end - start))[:, None]
+            table[segment] = np.asarray(color) + (np.asarray(next_color) - np.asarray(color)) * ratio
+        table[positions >= stops[-1][0]] = stops[-1][1]
+        return cls(np.clip(table, 0, 255).astype(np.uint8), limit)
+
+    @classmethod
+    def from_function(cls, function, size=256, limit=1.0):
+        """Samples function(values) -> (size, 3) 0-255 colors over [0, limit]."""
+        values = np.arange(size) * limit / (size - 1)
+        return cls(np.clip(function(values), 0, 255).astype(np.uint8), limit)
+
+    @classmethod
+    def from_config(cls, definition):
+        try:
+            stops = [(float(position), [float(c) for c in color]) for position, color in definition['stops']]
+            size = int(definition.get('size', 256))
+            limit = float(definition.get('limit', 1.0))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Invalid palette definition: {definition}")
+        if size < 2 or limit <= 0 or not stops or any(len(color) != 3 for _, color in stops):
+            raise ValueError(f"Invalid palette definition: {definition}")
+        if any(b[0] < a[0] for a, b in zip(stops, stops[1:])):
+            raise ValueError("Palette stops must be in increasing order")
+        return cls.from_stops(stops, size, limit)
+
+    def index(self, values):
+        index = (np.asarray(values) * self.scale + 0.5).astype(np.intp)
+        return np.clip(index, 0, self.size - 1, out=index)
+
+    def lookup(self, values):
+        """(..., 3) uint8 colors for an array of values."""
+        return self.table[self.index(values)]
+
+def configure(definitions):
+    """Sets the palette definitions from settings.json, dropping cached palettes that changed."""
+    global _definitions
+    for name in set(_definitions) | set(definitions):
+        if _definitions.get(name) != definitions.get(name):
+            _palettes.pop(name, None)
+    _definitions = dict(definitions)
+
+def get_palette(name, default):
+    """
+    Palette by name, compiled once and kept across effect switches. A
+    definition in settings.json replaces the default, which is either a stops
+    definition or a function returning a Palette.
+    """
+    palette = _palettes.get(name)
+    if palette is None:
+        definition = _definitions.get(name)
+        if definition is not None:
+            palette = Palette.from_config(definition)
+        elif callable(default):
+            palette = default()
+        else:
+            palette = Palette.from_config(default)
+        _palettes[name] = palette
+    return palette
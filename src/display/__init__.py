@@ -0,0 +1 @@
+# (arquivo vazio) 
\ No newline at end of file
@@ -0,0 +1,76 @@
+import numpy as np
+
+class ColorCorrection:
+    """
+    Output stage mapping each 8-bit channel through a gamma, brightness and
+    white-balance table. The three channel tables are stored back to back so
+    the whole strip frame is corrected with a single gather.
+
+    With dithering the tables keep 8 fractional bits and the remainder of
+    every LED is carried over to the next frame, so levels below one step
+    (very dim pixels at low brightness) average out over time instead of
+    rounding to a band.
+    """
+
+    def __init__(self, gamma=2.2, brightness=1.0, white_balance=(1.0, 1.0, 1.0), dither=True):
+        self.key = None
+        self.offsets = np.array([0, 256, 512], dtype=np.uint16)
+        self.table = None
+        self.index = None
+        self.total = None
+        self.residual = None
+        self.configure(gamma, brightness, white_balance, dither)
+
+    @classmethod
+    def from_config(cls, display_config):
+        """Builds the stage from display.correction, or returns None when disabled."""
+        config = display_config.get('correction', {})
+        if not config.get('enabled', False):
+            return None
+        return cls(
+            gamma=config.get('gamma', 2.2),
+            brightness=display_config['brightness'],
+            white_balance=config.get('white_balance', (1.0, 1.0, 1.0)),
+            dither=config.get('dither', True)
+        )
+
+    def configure(self, gamma, brightness, white_balance, dither):
+        """Rebuilds the tables, only if a setting actually changed."""
+        white_balance = tuple(float(w) for w in white_balance)
+        key = (float(gamma), float(brightness), white_balance, bool(dither))
+        if key == self.key:
+            return
+        if gamma <= 0 or not 0 < brightness <= 1:
+            raise ValueError("Invalid color correction settings")
+        if len(white_balance) != 3 or not all(0 <= w <= 1 for w in white_balance):
+            raise ValueError("White balance must be three factors between 0 and 1")
+        levels = (np.arange(256) / 255.0) ** gamma * 255 * brightness
+        table = np.outer(white_balance, levels).ravel()
+        if dither:
+            # 8.8 fixed point: integer level in the high byte, fraction in the low byte
+            self.table = np.round(table * 256).astype(np.uint16)
+        else:
+            self.table = np.round(table).astype(np.uint8)
+        self.key = key
+        self.gamma = gamma
+        self.brightness = brightness
+        self.white_balance = white_balance
+        self.dither = dither
+        self.residual = None
+
+    def apply(self, strip_frame):
+        """Corrects an (N, 3) uint8 strip frame in place."""
+        if self.index is None or self.index.shape != strip_frame.shape:
+            self.index = np.zeros(strip_frame.shape, dtype=np.uint16)
+            self.total = np.zeros(strip_frame.shape, dtype=np.uint16)
+        np.add(strip_frame, self.offsets, out=self.index)
+        if not self.dither:
+            np.take(self.table, self.index, out=strip_frame)
+            return strip_frame
+        if self.residual is None or self.residual.shape != strip_frame.shape:
+            self.residual = np.zeros(strip_frame.shape, dtype=np.uint16)
+        total = np.take(self.table, self.index, out=self.total)
+        total += self.residual
+        np.right_shift(total, 8, out=strip_frame, casting='unsafe')
+        np.bitwise_and(total, 0xFF, out=self.residual)
+        return strip_frame
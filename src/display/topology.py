@@ -0,0 +1,118 @@
+import numpy as np
+
+ROTATIONS = (0, 90, 180, 270)
+WIRINGS = ('progressive', 'serpentine')
+DIRECTIONS = ('vertical', 'horizontal')
+
+class PanelLayout:
+    """
+    Describes how the LED modules are placed and wired, and compiles that
+    description into a flat permutation from strip order to the logical frame.
+
+    Logical coordinates: x grows to the right across the whole panel and y
+    grows upwards, so frame[y, x] with y = 0 on the bottom row.
+
+    Module wiring before rotation: the first LED sits at the module's top-left
+    corner and runs down the first column ('vertical') or along the first row
+    ('horizontal'). 'serpentine' reverses every other run, 'progressive' keeps
+    them all in the same direction. Modules are chained through the grid row by
+    row from the top-left cell, reversing odd rows when chain is 'serpentine'.
+    """
+
+    def __init__(self, module_width, module_height, num_modules, columns=None, rows=1,
+                 wiring='progressive', direction='vertical', chain='progressive', modules=None):
+        if columns is None:
+            columns = num_modules // rows if rows > 0 else 0
+        if columns <= 0 or rows <= 0 or columns * rows != num_modules:
+            raise ValueError("Module grid does not match number of modules")
+        if wiring not in WIRINGS or chain not in WIRINGS:
+            raise ValueError(f"Wiring must be one of {WIRINGS}")
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Direction must be one of {DIRECTIONS}")
+        if modules is None:
+            # Stock panel: second and following modules mounted upside down
+            modules = [{'rotation': 0 if i == 0 else 180} for i in range(num_modules)]
+        if len(modules) != num_modules:
+            raise ValueError("Module list does not match number of modules")
+        self.module_width = module_width
+        self.module_height = module_height
+        self.num_modules = num_modules
+        self.columns = columns
+        self.rows = rows
+        self.wiring = wiring
+        self.direction = direction
+        self.chain = chain
+        self.modules = modules
+        self.width = columns * module_width
+        self.height = rows * module_height
+
+    @classmethod
+    def from_config(cls, display_config):
+        layout = display_config.get('layout', {})
+        return cls(
+            module_width=display_config['module_width'],
+            module_height=display_config['module_height'],
+            num_modules=display_config['num_modules'],
+            columns=layout.get('columns'),
+            rows=layout.get('rows', 1),
+            wiring=layout.get('wiring', 'progressive'),
+            direction=layout.get('direction', 'vertical'),
+            chain=layout.get('chain', 'progressive'),
+            modules=layout.get('modules')
+        )
+
+    def _grid_cell(self, module):
+        if 'position' in self.modules[module]:
+            column, row = self.modules[module]['position']
+        else:
+            row, column = divmod(module, self.columns)
+            if self.chain == 'serpentine' and row % 2 == 1:
+                column = self.columns - 1 - column
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            raise ValueError(f"Module {module} placed outside the grid")
+        return column, row
+
+    def origin(self, module):
+        """Logical (x, y) of the module's bottom-left pixel."""
+        column, row = self._grid_cell(module)
+        return column * self.module_width, (self.rows - 1 - row) * self.module_height
+
+    def _module_path(self, rotation, mirror):
+        w, h = self.module_width, self.module_height
+        runs, run_length = (w, h) if self.direction == 'vertical' else (h, w)
+        run = np.repeat(np.arange(runs), run_length)
+        step = np.tile(np.arange(run_length), runs)
+        if self.wiring == 'serpentine':
+            step = np.where(run % 2 == 1, run_length - 1 - step, step)
+        # Column and row (counted from the top) of each LED in strip order
+        if self.direction == 'vertical':
+            col, row = run, step
+        else:
+            col, row = step, run
+        if rotation not in ROTATIONS:
+            raise ValueError(f"Rotation must be one of {ROTATIONS}")
+        if rotation in (90, 270) and w != h:
+            raise ValueError("Only square modules can be rotated by 90 degrees")
+        if rotation == 90:
+            col, row = h - 1 - row, col
+        elif rotation == 180:
+            col, row = w - 1 - col, h - 1 - row
+        elif rotation == 270:
+            col, row = row, w - 1 - col
+        if mirror:
+            col = w - 1 - col
+        return col, row
+
+    def compile(self):
+        """Returns the int32 logical frame index of every LED in strip order."""
+        per_module = self.module_width * self.module_height
+        permutation = np.empty(per_module * self.num_modules, dtype=np.int32)
+        for module, options in enumerate(self.modules):
+            col, row = self._module_path(options.get('rotation', 0), options.get('mirror', False))
+            x0, y0 = self.origin(module)
+            x = x0 + col
+            y = y0 + self.module_height - 1 - row
+            permutation[module * per_module:(module + 1) * per_module] = y * self.width + x
+        if len(np.unique(permutation)) != len(permutation):
+            raise ValueError("Layout maps several LEDs to the same pixel")
+        return permutation
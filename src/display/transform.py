@@ -0,0 +1,83 @@
+import numpy as np
+
+FLAGS = ('flip_x', 'flip_y', 'module_flip_x', 'module_flip_y', 'swap_modules')
+# Single-option shorthands accepted as a transform string
+ALIASES = {'flip': 'flip_y', 'mirror': 'flip_x'}
+
+class OutputTransform:
+    """
+    Per-effect output transform of the logical frame, compiled into an index
+    map that DisplayController folds into the layout permutation, so it costs
+    nothing per frame.
+
+    Options, applied in this order:
+        module_flip_x, module_flip_y  mirror every module in place
+        swap_modules                  reverse the order of the modules
+        flip_x, flip_y                mirror the whole panel
+        rotate                        turn the panel clockwise by 0, 90, 180 or
+                                      270 degrees (90/270 need a square panel)
+
+    A spec is a dict of options, a single option name ("flip_y") or an alias
+    ("flip" = flip_y, "mirror" = flip_x).
+    """
+
+    def __init__(self, flip_x=False, flip_y=False, rotate=0, module_flip_x=False, module_flip_y=False,
+                 swap_modules=False):
+        if rotate not in (0, 90, 180, 270):
+            raise ValueError("Transform rotation must be 0, 90, 180 or 270")
+        self.flip_x = flip_x
+        self.flip_y = flip_y
+        self.rotate = rotate
+        self.module_flip_x = module_flip_x
+        self.module_flip_y = module_flip_y
+        self.swap_modules = swap_modules
+
+    @classmethod
+    def from_config(cls, spec):
+        """OutputTransform of a settings.json spec, None for the identity."""
+        if spec is None:
+            return None
+        if isinstance(spec, str):
+            option = ALIASES.get(spec, spec)
+            if option not in FLAGS:
+                raise ValueError(f"Unknown transform: {spec}")
+            spec = {option: True}
+        if not isinstance(spec, dict):
+            raise ValueError(f"Invalid transform: {spec}")
+        unknown = set(spec) - set(FLAGS) - {'rotate'}
+        if unknown:
+            raise ValueError(f"Unknown transform options: {', '.join(sorted(unknown))}")
+        transform = cls(**spec)
+        return transform if transform.active else None
+
+    @property
+    def active(self):
+        return self.rotate != 0 or any(getattr(self, flag) for flag in FLAGS)
+
+    def compile(self, panel_width, panel_height, origins, module_width, module_height):
+        """
+        Returns, for every logical pixel of the transformed frame, the index of
+        the effect's frame pixel shown there.
+        """
+        if self.rotate in (90, 270) and panel_width != panel_height:
+            raise ValueError("Rotating by 90 or 270 degrees needs a square panel")
+        # The transform is applied to an image of frame indices, exactly as it
+        # would be to the frame itself
+        image = np.arange(panel_width * panel_height, dtype=np.int32).reshape(panel_height, panel_width)
+        blocks = [(slice(y0, y0 + module_height), slice(x0, x0 + module_width)) for x0, y0 in origins]
+        for block in blocks:
+            if self.module_flip_x:
+                image[block] = image[block][:, ::-1].copy()
+            if self.module_flip_y:
+                image[block] = image[block][::-1].copy()
+        if self.swap_modules:
+            source = image.copy()
+            for block, other in zip(blocks, reversed(blocks)):
+                image[block] = source[other]
+        if self.flip_x:
+            image = image[:, ::-1]
+        if self.flip_y:
+            image = image[::-1]
+        # y grows upwards, so rot90's counterclockwise turn of the rows is clockwise on the panel
+        image = np.rot90(image, self.rotate // 90)
+        return np.ascontiguousarray(image).ravel()
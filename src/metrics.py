@@ -0,0 +1,205 @@
+import math
+import os
+import threading
+import time
+import numpy as np
+from src.base import Logger
+
+STAGES = ('frame', 'render', 'show', 'audio_age')
+
+class StageHistogram:
+    """
+    Log-bucketed duration histogram kept as a ring of fixed-length time windows,
+    so percentiles always cover the last windows * window_seconds of frames.
+    """
+    MIN_SECONDS = 1e-5
+    MAX_SECONDS = 1.0
+    BUCKETS = 200
+
+    def __init__(self, windows, window_seconds):
+        self.counts = np.zeros((windows, self.BUCKETS), dtype=np.int64)
+        self.window_seconds = window_seconds
+        self.window = int(time.monotonic() / window_seconds)
+        self.scale = self.BUCKETS / math.log(self.MAX_SECONDS / self.MIN_SECONDS)
+        self.total = 0
+        # Upper bound of every bucket, reported as the percentile value
+        self.edges = self.MIN_SECONDS * np.exp((np.arange(self.BUCKETS) + 1) / self.scale)
+
+    def add(self, seconds, now):
+        window = int(now / self.window_seconds)
+        if window != self.window:
+            # Clear the windows skipped since the last sample before reusing them
+            for skipped in range(self.window + 1, min(window, self.window + len(self.counts)) + 1):
+                self.counts[skipped % len(self.counts)] = 0
+            self.window = window
+        if seconds <= self.MIN_SECONDS:
+            bucket = 0
+        else:
+            bucket = min(self.BUCKETS - 1, int(math.log(seconds / self.MIN_SECONDS) * self.scale))
+        self.counts[window % len(self.counts), bucket] += 1
+        self.total += 1
+
+    def percentiles(self, quantiles):
+        merged = self.counts.sum(axis=0)
+        count = int(merged.sum())
+        if not count:
+            return None, 0
+        cumulative = np.cumsum(merged)
+        buckets = np.searchsorted(cumulative, [q * count for q in quantiles])
+        return self.edges[np.minimum(buckets, self.BUCKETS - 1)], count
+
+class FrameMetrics:
+    """
+    Render pipeline instrumentation. Stage durations are recorded per effect;
+    only stages listed in the configuration are kept, and the render loop skips
+    all timing calls when metrics are disabled.
+    """
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, stages=STAGES, budget=1 / 60, report_interval=10, prometheus_file=None,
+                 windows=60, window_seconds=1.0):
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown metrics stages: {', '.join(sorted(unknown))}")
+        self.stages = set(stages)
+        self.budget = budget
+        self.report_interval = report_interval
+        self.prometheus_file = prometheus_file
+        self.windows = windows
+        self.window_seconds = window_seconds
+        self.histograms = {}
+        self.label = ''
+        self.missed_deadlines = {}
+        self.dropped_frames = 0
+        self.repeated_frames = 0
+        self.dropped_output_frames = 0
+        self.restarts = {}
+        self.recoveries = 0
+        self.recovery_seconds = 0.0
+        self.last_recovery = 0.0
+        # The display output thread records the 'show' stage concurrently
+        self.lock = threading.Lock()
+        self.next_report = time.monotonic() + report_interval
+
+    @classmethod
+    def from_config(cls, config, budget):
+        if not config.get('enabled', False):
+            return None
+        return cls(
+            stages=config.get('stages', STAGES),
+            budget=budget,
+            report_interval=config.get('report_interval', 10),
+            prometheus_file=config.get('prometheus_file'),
+            windows=config.get('windows', 60),
+            window_seconds=config.get('window_seconds', 1.0)
+        )
+
+    def enable(self, stage):
+        if stage not in STAGES:
+            raise ValueError(f"Unknown metrics stage: {stage}")
+        self.stages.add(stage)
+
+    def record(self, stage, seconds, now=None):
+        if stage not in self.stages:
+            return
+        if now is None:
+            now = time.monotonic()
+        with self.lock:
+            key = (stage, self.label)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = StageHistogram(self.windows, self.window_seconds)
+            histogram.add(seconds, now)
+            if stage == 'render' and seconds > self.budget:
+                self.missed_deadlines[self.label] = self.missed_deadlines.get(self.label, 0) + 1
+
+    def record_output_drop(self):
+        """Counts a frame replaced before the output thread could push it."""
+        with self.lock:
+            self.dropped_output_frames += 1
+
+    def record_audio_frame(self, sequence, last_sequence):
+        """Counts audio frames skipped or rendered twice since the previous frame."""
+        if sequence == last_sequence:
+            self.repeated_frames += 1
+        elif sequence > last_sequence + 1 and last_sequence:
+            self.dropped_frames += sequence - last_sequence - 1
+
+    def record_restart(self, reason):
+        """Counts an audio backend restart (called from the supervisor thread)."""
+        with self.lock:
+            self.restarts[reason] = self.restarts.get(reason, 0) + 1
+
+    def record_recovery(self, seconds):
+        """Time from a detected audio failure to the first frame after the restart."""
+        with self.lock:
+            self.recoveries += 1
+            self.recovery_seconds += seconds
+            self.last_recovery = seconds
+
+    def tick(self, now):
+        if now < self.next_report:
+            return
+        self.next_report = now + self.report_interval
+        self.report()
+
+    def summary(self):
+        rows = []
+        with self.lock:
+            for (stage, label), histogram in sorted(self.histograms.items()):
+                values, count = histogram.percentiles(self.QUANTILES)
+                if count:
+                    rows.append((stage, label, values, count))
+        return rows
+
+    def report(self):
+        rows = self.summary()
+        for stage, label, values, count in rows:
+            p50, p95, p99 = (v * 1000 for v in values)
+            Logger.info(f"[{label}] {stage}: p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms ({count} frames)")
+        missed = ', '.join(f"{label} {count}" for label, count in sorted(self.missed_deadlines.items()))
+        Logger.info(f"Missed deadlines: {missed or 'none'} - dropped audio frames: {self.dropped_frames}, "
+                    f"repeated: {self.repeated_frames}, dropped output frames: {self.dropped_output_frames}")
+        if self.restarts:
+            restarts = ', '.join(f"{reason} {count}" for reason, count in sorted(self.restarts.items()))
+            Logger.info(f"Audio restarts: {restarts} - last recovery {self.last_recovery:.2f} s")
+        if self.prometheus_file:
+            try:
+                self.write_prometheus(rows)
+            except OSError as e:
+                Logger.warn(f"Could not write metrics file: {e}")
+
+    def write_prometheus(self, rows):
+        lines = [
+            '# HELP ledcava_stage_seconds Render pipeline stage durations over the recent windows.',
+            '# TYPE ledcava_stage_seconds summary'
+        ]
+        for stage, label, values, count in rows:
+            labels = f'stage="{stage}",effect="{label}"'
+            for quantile, value in zip(self.QUANTILES, values):
+                lines.append(f'ledcava_stage_seconds{{{labels},quantile="{quantile}"}} {value:.6f}')
+            lines.append(f'ledcava_stage_seconds_count{{{labels}}} {count}')
+        lines.append('# HELP ledcava_missed_deadlines_total Frames whose render exceeded the frame budget.')
+        lines.append('# TYPE ledcava_missed_deadlines_total counter')
+        for label, count in sorted(self.missed_deadlines.items()):
+            lines.append(f'ledcava_missed_deadlines_total{{effect="{label}"}} {count}')
+        lines.append('# TYPE ledcava_dropped_audio_frames_total counter')
+        lines.append(f'ledcava_dropped_audio_frames_total {self.dropped_frames}')
+        lines.append('# TYPE ledcava_repeated_audio_frames_total counter')
+        lines.append(f'ledcava_repeated_audio_frames_total {self.repeated_frames}')
+        lines.append('# TYPE ledcava_dropped_output_frames_total counter')
+        lines.append(f'ledcava_dropped_output_frames_total {self.dropped_output_frames}')
+        lines.append('# HELP ledcava_audio_restarts_total Audio backend restarts by failure reason.')
+        lines.append('# TYPE ledcava_audio_restarts_total counter')
+        for reason, count in sorted(self.restarts.items()):
+            lines.append(f'ledcava_audio_restarts_total{{reason="{reason}"}} {count}')
+        lines.append('# HELP ledcava_audio_recovery_seconds Time from an audio failure to the first frame after the restart.')
+        lines.append('# TYPE ledcava_audio_recovery_seconds summary')
+        lines.append(f'ledcava_audio_recovery_seconds_sum {self.recovery_seconds:.6f}')
+        lines.append(f'ledcava_audio_recovery_seconds_count {self.recoveries}')
+        lines.append('# TYPE ledcava_audio_last_recovery_seconds gauge')
+        lines.append(f'ledcava_audio_last_recovery_seconds {self.last_recovery:.6f}')
+        temp_file = f"{self.prometheus_file}.tmp"
+        with open(temp_file, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temp_file, self.prometheus_file)
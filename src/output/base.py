@@ -0,0 +1,48 @@
+class OutputBackend:
+    """
+    Destination for rendered frames. Frames arrive in strip order as
+    (num_pixels, 3) uint8 RGB, already remapped and color corrected.
+    write() copies the frame into the backend's own buffers and must be quick;
+    show() transmits it and may take as long as the transport needs.
+    """
+
+    def __init__(self, num_pixels):
+        self.num_pixels = num_pixels
+
+    def begin(self):
+        pass
+
+    def write(self, pixels):
+        raise NotImplementedError
+
+    def show(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+def create_backend(display_config, brightness):
+    """
+    Builds the backend selected by display.output. brightness is what a
+    hardware strip should apply itself (1.0 when a correction stage does it).
+    """
+    config = display_config.get('output', {})
+    backend = config.get('backend', 'ws281x')
+    num_pixels = display_config['num_pixels']
+    if backend == 'ws281x':
+        from src.output.ws281x import Ws281xBackend
+        return Ws281xBackend(num_pixels, display_config.get('gpio_pin', 18), brightness)
+    if backend == 'null':
+        from src.output.null import NullBackend
+        return NullBackend(num_pixels)
+    if backend == 'recorder':
+        from src.output.recorder import FrameRecorder
+        return FrameRecorder(num_pixels, config.get('path', '/tmp/ledcava.frames'))
+    if backend in ('ddp', 'e131'):
+        from src.output.udp import DdpBackend, E131Backend
+        if not config.get('host'):
+            raise ValueError(f"Output backend {backend} needs a host")
+        if backend == 'ddp':
+            return DdpBackend(num_pixels, config['host'], config.get('port'))
+        return E131Backend(num_pixels, config['host'], config.get('port'), config.get('universe', 1))
+    raise ValueError(f"Unknown output backend: {backend}")
@@ -0,0 +1,15 @@
+from src.output.base import OutputBackend
+
+class NullBackend(OutputBackend):
+    """Accepts frames and discards them; for benchmarks and headless runs."""
+
+    def __init__(self, num_pixels):
+        super().__init__(num_pixels)
+        self.pixels = None
+        self.frames = 0
+
+    def write(self, pixels):
+        self.pixels = pixels
+
+    def show(self):
+        self.frames += 1
@@ -0,0 +1,28 @@
+import time
+from src.output.base import OutputBackend
+from src.recording import RecordingWriter
+
+class FrameRecorder(OutputBackend):
+    """Writes every frame to a recording file (see src/recording.py) instead of LEDs."""
+
+    def __init__(self, num_pixels, path):
+        super().__init__(num_pixels)
+        self.path = path
+        self.writer = None
+        self.pixels = None
+        self.frames = 0
+
+    def begin(self):
+        self.writer = RecordingWriter(self.path, 0, self.num_pixels)
+
+    def write(self, pixels):
+        self.pixels = pixels
+
+    def show(self):
+        self.writer.write(time.time(), rgb=self.pixels)
+        self.frames += 1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
@@ -0,0 +1,136 @@
+import socket
+import struct
+import uuid
+import numpy as np
+from src.base import Logger
+from src.output.base import OutputBackend
+
+# Linux UDP generic segmentation offload: one sendmsg() carrying several
+# equally sized datagrams, split by the kernel
+SOL_UDP = getattr(socket, 'SOL_UDP', 17)
+UDP_SEGMENT = getattr(socket, 'UDP_SEGMENT', 103)
+GSO_MAX_SEGMENTS = 64
+GSO_MAX_BYTES = 65000
+
+class UdpBackend(OutputBackend):
+    """
+    Sends frames as a series of UDP packets. Packet headers are built once and
+    only their sequence fields change per frame; payloads are views into the
+    frame buffer, so show() sends headers and pixels scatter-gather without
+    copying. With UDP segmentation offload all packets of a batch go out in a
+    single syscall, otherwise one sendmsg() per packet.
+    """
+    PORT = None
+    PAYLOAD_BYTES = None
+
+    def __init__(self, num_pixels, host, port=None):
+        super().__init__(num_pixels)
+        self.address = (host, port or self.PORT)
+        self.pixels = np.zeros((num_pixels, 3), dtype=np.uint8)
+        data = memoryview(self.pixels).cast('B')
+        self.packets = []
+        for index, offset in enumerate(range(0, len(data), self.PAYLOAD_BYTES)):
+            payload = data[offset:offset + self.PAYLOAD_BYTES]
+            self.packets.append((self.build_header(index, offset, len(payload)), payload))
+        self.sequence = 0
+        self.socket = None
+        self.batches = self._batches()
+
+    def _batches(self):
+        """Groups packets for segmentation offload: all but the last of a batch must be full size."""
+        batches = []
+        size = len(self.packets[0][0]) + self.PAYLOAD_BYTES
+        per_batch = max(1, min(GSO_MAX_SEGMENTS, GSO_MAX_BYTES // size))
+        for start in range(0, len(self.packets), per_batch):
+            batch = self.packets[start:start + per_batch]
+            buffers = [part for packet in batch for part in packet]
+            batches.append((buffers, [(SOL_UDP, UDP_SEGMENT, struct.pack('=H', size))] if len(batch) > 1 else []))
+        return batches
+
+    def build_header(self, index, offset, length):
+        raise NotImplementedError
+
+    def set_sequence(self, header, sequence):
+        raise NotImplementedError
+
+    def begin(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def write(self, pixels):
+        self.pixels[:] = pixels
+
+    def show(self):
+        self.sequence = (self.sequence + 1) & 0xFF
+        for header, _ in self.packets:
+            self.set_sequence(header, self.sequence)
+        if self.batches is not None:
+            try:
+                for buffers, ancillary in self.batches:
+                    self.socket.sendmsg(buffers, ancillary, 0, self.address)
+                return
+            except OSError as e:
+                # No segmentation offload (kernel or interface): fall back for good
+                Logger.warn(f"UDP segmentation offload unavailable ({e}) - sending one packet per syscall")
+                self.batches = None
+        for packet in self.packets:
+            self.socket.sendmsg(packet, [], 0, self.address)
+
+    def close(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+class DdpBackend(UdpBackend):
+    """Distributed Display Protocol (WLED, xLights): RGB24 pushed to the default display."""
+    PORT = 4048
+    PAYLOAD_BYTES = 1440
+    FLAGS = 0x40  # Protocol version 1
+    PUSH = 0x01
+    RGB24 = 0x0B
+    DISPLAY = 1
+
+    def build_header(self, index, offset, length):
+        flags = self.FLAGS
+        if offset + length >= self.num_pixels * 3:
+            # Last packet of the frame: display it
+            flags |= self.PUSH
+        return bytearray(struct.pack('>BBBBIH', flags, 0, self.RGB24, self.DISPLAY, offset, length))
+
+    def set_sequence(self, header, sequence):
+        header[1] = sequence % 15 + 1  # 1-15, 0 means unused
+
+class E131Backend(UdpBackend):
+    """
+    sACN (E1.31) data packets, 170 RGB pixels per universe so no pixel is split
+    across universes. Universes are numbered upwards from the first one.
+    """
+    PORT = 5568
+    PAYLOAD_BYTES = 510
+    SOURCE_NAME = b'ledcava'
+    PRIORITY = 100
+
+    def __init__(self, num_pixels, host, port=None, universe=1):
+        if not 1 <= universe <= 63999:
+            raise ValueError("E1.31 universe must be between 1 and 63999")
+        self.universe = universe
+        self.cid = uuid.uuid4().bytes
+        super().__init__(num_pixels, host, port)
+        if self.universe + len(self.packets) - 1 > 63999:
+            raise ValueError("Too many pixels for the E1.31 universe range")
+
+    def build_header(self, index, offset, length):
+        size = 126 + length
+        header = bytearray(126)
+        # Root layer
+        struct.pack_into('>HH12sHI16s', header, 0, 0x0010, 0x0000, b'ASC-E1.17\x00\x00\x00',
+                         0x7000 | (size - 16), 0x00000004, self.cid)
+        # Framing layer
+        struct.pack_into('>HI64sBHBBH', header, 38, 0x7000 | (size - 38), 0x00000002, self.SOURCE_NAME,
+                         self.PRIORITY, 0, 0, 0, self.universe + index)
+        # DMP layer: start code 0 followed by the channel data
+        struct.pack_into('>HBBHHHB', header, 115, 0x7000 | (size - 115), 0x02, 0xA1, 0x0000, 0x0001,
+                         length + 1, 0x00)
+        return header
+
+    def set_sequence(self, header, sequence):
+        header[111] = sequence
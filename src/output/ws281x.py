@@ -0,0 +1,61 @@
+import ctypes
+import numpy as np
+from src.output.base import OutputBackend
+
+class Ws281xBackend(OutputBackend):
+    """Drives a WS281x strip from the Pi's GPIO through rpi_ws281x."""
+    LED_FREQ_HZ = 800000
+    LED_DMA = 10
+    LED_INVERT = False
+    LED_CHANNEL = 0
+
+    def __init__(self, num_pixels, gpio_pin, brightness=1.0, strip=None):
+        super().__init__(num_pixels)
+        self.gpio_pin = gpio_pin
+        self.brightness = brightness
+        self.strip = strip
+        self.words = np.zeros(num_pixels, dtype=np.uint32)
+        self.led_buffer = None
+
+    def begin(self):
+        if self.strip is None:
+            from rpi_ws281x import PixelStrip
+            self.strip = PixelStrip(self.num_pixels, self.gpio_pin, self.LED_FREQ_HZ, self.LED_DMA,
+                                    self.LED_INVERT, int(self.brightness * 255), self.LED_CHANNEL)
+        self.strip.begin()
+        self.led_buffer = self._map_led_buffer()
+        if self.led_buffer is None:
+            from src.base import Logger
+            Logger.warn("Direct LED buffer unavailable - falling back to per-pixel updates")
+
+    def _map_led_buffer(self):
+        """Maps the ws2811 channel LED array as a uint32 numpy view."""
+        if getattr(self.strip, 'led_buffer', None) is not None:
+            # Off-hardware strips expose their word array directly
+            return self.strip.led_buffer
+        try:
+            from rpi_ws281x import ws
+            channel = getattr(self.strip, '_channel', None)
+            if channel is None:
+                channel = ws.ws2811_channel_get(self.strip._leds, self.LED_CHANNEL)
+            address = int(ws.ws2811_channel_t_leds_get(channel))
+            if not address:
+                return None
+            leds = (ctypes.c_uint32 * self.num_pixels).from_address(address)
+            return np.frombuffer(leds, dtype=np.uint32)
+        except Exception:
+            return None
+
+    def write(self, pixels):
+        # Same 0x00RRGGBB word Color() builds; the ws2811 driver reorders to GRB on render
+        np.left_shift(pixels[:, 0], 16, out=self.words, dtype=np.uint32)
+        self.words |= pixels[:, 1].astype(np.uint32) << 8
+        self.words |= pixels[:, 2]
+        if self.led_buffer is not None:
+            self.led_buffer[:] = self.words
+        else:
+            for index, word in enumerate(self.words.tolist()):
+                self.strip.setPixelColor(index, word)
+
+    def show(self):
+        self.strip.show()
@@ -0,0 +1,174 @@
+import subprocess
+import shlex
+import time
+import wave
+from threading import Thread
+import numpy as np
+from src.base import Logger
+from src.processor.cava_manager import load_config
+from src.processor.source import AudioSource
+
+class SpectrumAnalyzer(AudioSource):
+    """
+    In-process replacement for the CAVA subprocess. Reads 16-bit PCM from a raw
+    pipe, FIFO, WAV file or capture command, runs a windowed real FFT per frame
+    and groups the bins into log-spaced bands. Publishes frames through the same
+    get_data()/get_spectrum() contract as CAVAManager.
+    """
+
+    def __init__(self):
+        config = load_config()
+        audio = config['audio']
+        options = audio.get('analyzer', {})
+        super().__init__(audio['bars'], audio.get('smoothing'))
+        self.framerate = audio['framerate']
+        if self.bars <= 0 or self.framerate <= 0:
+            raise ValueError("Invalid audio settings")
+        self.source = options.get('source')
+        self.command = options.get('command')
+        if not self.source and not self.command:
+            raise ValueError("Analyzer needs a PCM source or capture command")
+        self.sample_rate = options.get('sample_rate', 44100)
+        self.channels = options.get('channels', 2)
+        self.fft_size = options.get('fft_size', 2048)
+        self.min_freq = options.get('min_freq', 50)
+        self.max_freq = options.get('max_freq', 12000)
+        self.gravity = options.get('gravity', 4.0)
+        self.noise_reduction = options.get('noise_reduction', 0.5)
+        self.noise_floor = options.get('noise_floor', -60.0)
+        self.realtime = options.get('realtime')
+        if not 0 <= self.noise_reduction < 1 or self.noise_floor >= 0:
+            raise ValueError("Invalid analyzer smoothing settings")
+        # Every frame slides the window by one hop of sample_rate / framerate samples
+        if self.fft_size < self.sample_rate // self.framerate:
+            raise ValueError("Analyzer fft_size must be at least sample_rate / framerate")
+        self.running = False
+        self.stream = None
+        self.wav = None
+        self.process = None
+
+    def _band_edges(self):
+        """First FFT bin of every band, log-spaced, at least one bin per band."""
+        nyquist = self.sample_rate / 2
+        max_freq = min(self.max_freq, nyquist)
+        freqs = np.geomspace(self.min_freq, max_freq, self.bars + 1)
+        bins = np.round(freqs / nyquist * (self.fft_size // 2)).astype(np.int64)
+        bins[0] = max(bins[0], 1)
+        for i in range(1, len(bins)):
+            bins[i] = max(bins[i], bins[i - 1] + 1)
+        if bins[-1] > self.fft_size // 2 + 1:
+            raise ValueError("FFT size too small for the number of bars")
+        return bins
+
+    def _open(self):
+        if self.command:
+            command = shlex.split(self.command) if isinstance(self.command, str) else self.command
+            self.process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0)
+            self.stream = self.process.stdout
+        elif self.source.endswith('.wav'):
+            self.wav = wave.open(self.source, 'rb')
+            if self.wav.getsampwidth() != 2:
+                raise RuntimeError("Only 16-bit WAV files are supported")
+            self.sample_rate = self.wav.getframerate()
+            self.channels = self.wav.getnchannels()
+            if self.fft_size < self.sample_rate // self.framerate:
+                raise RuntimeError(f"fft_size too small for a {self.sample_rate} Hz WAV file")
+            if self.realtime is None:
+                self.realtime = True
+        else:
+            # Raw S16_LE from a pipe or FIFO, paced by the writer
+            self.stream = open(self.source, 'rb', buffering=0)
+
+    def start(self):
+        try:
+            self._open()
+        except Exception as e:
+            Logger.error(f"Analyzer runtime exception: {str(e)}")
+            raise RuntimeError(f"Analyzer source error: {str(e)}")
+        self.running = True
+        Thread(target=self._process, daemon=True).start()
+        Logger.info("Spectrum analyzer started")
+
+    def _read_block(self, buffer, view):
+        if self.wav is not None:
+            data = self.wav.readframes(len(buffer) // (2 * self.channels))
+            if len(data) < len(buffer):
+                self.wav.rewind()
+                data += self.wav.readframes((len(buffer) - len(data)) // (2 * self.channels))
+            buffer[:len(data)] = data
+            return len(data) == len(buffer)
+        filled = 0
+        while filled < len(buffer):
+            count = self.stream.readinto(view[filled:])
+            if not count:
+                return False
+            filled += count
+        return True
+
+    def _process(self):
+        hop = max(1, self.sample_rate // self.framerate)
+        block = bytearray(hop * self.channels * 2)
+        view = memoryview(block)
+        pcm = np.frombuffer(block, dtype='<i2').reshape(hop, self.channels)
+        samples = np.zeros(self.fft_size, dtype=np.float32)
+        window = np.hanning(self.fft_size).astype(np.float32)
+        windowed = np.empty(self.fft_size, dtype=np.float32)
+        edges = self._band_edges()
+        starts = edges[:-1]
+        widths = np.diff(edges).astype(np.float32)
+        bands = np.zeros(self.bars, dtype=np.float32)
+        levels = np.zeros(self.bars, dtype=np.float32)
+        fall = np.zeros(self.bars, dtype=np.float32)
+        scaled = np.zeros(self.bars, dtype=np.float32)
+        reference = 1e-3
+        frame_interval = hop / self.sample_rate
+        next_frame = time.monotonic()
+        while self.running:
+            try:
+                if not self._read_block(block, view):
+                    Logger.warn("Analyzer input closed")
+                    break
+                capture_time = time.monotonic()
+                # Slide the analysis window by one hop, mixing channels to mono
+                samples[:-hop] = samples[hop:]
+                np.mean(pcm, axis=1, out=samples[-hop:])
+                np.multiply(samples, window, out=windowed)
+                magnitude = np.abs(np.fft.rfft(windowed))
+                np.divide(np.add.reduceat(magnitude[:edges[-1]], starts), widths, out=bands)
+                # Automatic gain against a slowly decaying running peak
+                reference = max(reference * 0.999, float(bands.max()))
+                decibels = 20 * np.log10(np.maximum(bands / reference, 1e-6))
+                target = np.clip(1 - decibels / self.noise_floor, 0, 1)
+                # Noise reduction smooths the rise, gravity accelerates the fall
+                target = levels * self.noise_reduction + target * (1 - self.noise_reduction)
+                falling = target < levels
+                fall = np.where(falling, fall + self.gravity * frame_interval, 0)
+                np.copyto(levels, np.where(falling, np.maximum(target, levels - fall * frame_interval), target))
+                back = self._back()
+                np.multiply(levels, 9, out=scaled)
+                np.minimum(scaled, 8, out=scaled)
+                np.copyto(back['levels'], scaled, casting='unsafe')
+                np.copyto(back['spectrum'], levels)
+                self._commit(capture_time)
+                if self.realtime:
+                    next_frame += frame_interval
+                    time.sleep(max(0.0, next_frame - time.monotonic()))
+            except Exception as e:
+                if self.running:
+                    Logger.error(f"Analyzer processing error: {e}")
+                break
+
+    def stop(self):
+        self.running = False
+        if self.process:
+            self.process.terminate()
+            self.process = None
+        for stream in (self.stream, self.wav):
+            if stream is not None:
+                try:
+                    stream.close()
+                except Exception:
+                    pass
+        self.stream = None
+        self.wav = None
+        Logger.info("Spectrum analyzer stopped")
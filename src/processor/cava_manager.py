@@ -1,30 +1,59 @@
 import os
 import subprocess
-from threading import Thread, Lock
+from threading import Event, Lock, Thread
 import time
 import json
 import shutil
+import shlex
+import numpy as np
 from src.base import Logger
+from src.processor.source import AudioSource
 
 def load_config():
     with open('settings.json', 'r') as f:
         return json.load(f)
 
-class CAVAManager:
+class CAVAManager(AudioSource):
+    """
+    Runs CAVA as a supervised subprocess. A watchdog thread restarts it with
+    exponential backoff when its output ends, it exits, it stops producing
+    frames for stall_timeout seconds or its output is malformed; the config
+    file is written once and reused by every respawn.
+    """
+
     def __init__(self):
         config = load_config()
-        self.bars = config['audio']['bars']
+        super().__init__(config['audio']['bars'], config['audio'].get('smoothing'))
         self.framerate = config['audio']['framerate']
+        self.data_format = config['audio'].get('data_format', 'ascii')
+        self.bit_format = config['audio'].get('bit_format', 16)
+        self.command = shlex.split(config['audio'].get('executable', 'cava'))
         if self.bars <= 0 or self.framerate <= 0:
             raise ValueError("Invalid audio settings")
-        self.audio_data = [0] * self.bars
-        self.lock = Lock()
+        if self.data_format not in ('ascii', 'binary') or self.bit_format not in (8, 16):
+            raise ValueError("Invalid CAVA output format")
+        supervisor = config['audio'].get('supervisor', {})
+        self.stall_timeout = supervisor.get('stall_timeout', 1.0)
+        self.max_errors = supervisor.get('max_errors', 10)
+        self.backoff = supervisor.get('backoff', 0.1)
+        self.max_backoff = supervisor.get('max_backoff', 10.0)
+        if self.stall_timeout <= 0 or self.max_errors < 1 or not 0 < self.backoff <= self.max_backoff:
+            raise ValueError("Invalid CAVA supervisor settings")
+        self.max_value = (1 << self.bit_format) - 1
         self.process = None
+        self.reader = None
         self.running = False
+        self.stopped = Event()
+        # Serializes the supervisor's respawns with stop(), which would
+        # otherwise miss a process spawned while it tears down
+        self.lock = Lock()
+        # Set by the reader or restart() to make the supervisor respawn CAVA
+        self.failure = None
+        self.restarts = 0
         self.config_file = '/tmp/cava_config'
 
     def create_config(self):
-        if not shutil.which('cava'):
+        if not shutil.which(self.command[0]):
             Logger.error("CAVA executable not found")
             raise RuntimeError("CAVA not installed")
         config = f"""
@@ -40,8 +69,7 @@ channels = stereo
 [output]
 method = raw
 raw_target = /dev/stdout
-data_format = ascii
-ascii_max_range = 8
+{self._output_config()}
 
 [smoothing]
 noise_reduction = 0
@@ -63,24 +91,24 @@ ignore = 0
         with open(self.config_file, 'w') as f:
             f.write(config)
 
+    def _output_config(self):
+        if self.data_format == 'binary':
+            return f"data_format = binary\nbit_format = {self.bit_format}bit"
+        return "data_format = ascii\nascii_max_range = 8"
+
     def start(self):
         try:
             self.create_config()
             self.running = True
+            self.stopped.clear()
             os.nice(-20)
-            self.process = subprocess.Popen(
-                ['cava', '-p', self.config_file],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                bufsize=0,
-                universal_newlines=False
-            )
+            self._spawn()
             time.sleep(0.1)
             if self.process.poll() is not None:
                 error = self.process.stderr.read().decode()
                 Logger.error(f"CAVA initialization failed: {error.strip()}")
                 raise RuntimeError(f"CAVA startup failure: {error.strip()}")
-            Thread(target=self._read_output, daemon=True).start()
+            Thread(target=self._supervise, daemon=True).start()
             Logger.info("CAVA started")
         except Exception as e:
             self.running = False
@@ -90,48 +118,192 @@ ignore = 0
             Logger.error(f"CAVA runtime exception: {str(e)}")
             raise RuntimeError(f"CAVA operation error: {str(e)}")
 
-    def _read_output(self):
+    def _spawn(self):
+        self.failure = None
+        self.process = subprocess.Popen(
+            self.command + ['-p', self.config_file],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+            universal_newlines=False
+        )
+        self.reader = Thread(target=self._read_output, args=(self.process,), daemon=True)
+        self.reader.start()
+
+    def _terminate(self):
+        process = self.process
+        if process is None:
+            return
+        process.terminate()
+        try:
+            process.wait(1.0)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        # The reader sees EOF once the pipe closes; joined so that only one
+        # thread ever fills the frame exchange
+        if self.reader:
+            self.reader.join(1.0)
+        process.stdout.close()
+        process.stderr.close()
+
+    def _supervise(self):
+        attempt = 0
+        failed_at = None
+        while self.running:
+            spawned = time.monotonic()
+            reason = self._watch(failed_at)
+            if reason is None:
+                break
+            failed_at = time.monotonic()
+            # A process that ran longer than the longest backoff starts over
+            if failed_at - spawned > self.max_backoff:
+                attempt = 0
+            Logger.warn(f"CAVA {reason} - restarting...")
+            self._terminate()
+            while self.running:
+                delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+                attempt += 1
+                if self.stopped.wait(delay):
+                    return
+                try:
+                    with self.lock:
+                        if self.stopped.is_set():
+                            return
+                        self._spawn()
+                    break
+                except OSError as e:
+                    Logger.error(f"CAVA respawn failed: {e}")
+            self.restarts += 1
+            if self.metrics is not None:
+                self.metrics.record_restart(reason.split()[0])
+
+    def _watch(self, failed_at):
+        """Waits for the current process to fail and returns why, None once stopped."""
+        process = self.process
+        sequence = self.sequence
+        last_frame = time.monotonic()
+        while not self.stopped.wait(min(0.05, self.stall_timeout / 4)):
+            now = time.monotonic()
+            if self.sequence != sequence:
+                sequence = self.sequence
+                last_frame = now
+                if failed_at is not None:
+                    Logger.info(f"CAVA recovered in {now - failed_at:.2f} s (restart {self.restarts})")
+                    if self.metrics is not None:
+                        self.metrics.record_recovery(now - failed_at)
+                    failed_at = None
+            failure = self.failure
+            if failure == 'eof':
+                # Tell a crash from a clean exit once the process is reaped
+                try:
+                    process.wait(0.2)
+                except subprocess.TimeoutExpired:
+                    pass
+            code = process.poll()
+            if code:
+                return f"exit with code {code}"
+            if failure:
+                return failure
+            if code is not None:
+                return 'eof'
+            if now - last_frame > self.stall_timeout:
+                return f"stall ({now - last_frame:.1f} s without frames)"
+        return None
+
+    def _read_output(self, process):
+        if self.data_format == 'binary':
+            self._read_binary(process)
+        else:
+            self._read_ascii(process)
+
+    def _fail(self, process, reason):
+        # Stale readers of an already replaced process report nothing
+        if self.running and process is self.process and not self.failure:
+            self.failure = reason
+
+    def _read_ascii(self, process):
         consecutive_errors = 0
-        while self.running and self.process:
+        stdout = process.stdout
+        while self.running and process is self.process:
             try:
-                line = self.process.stdout.readline().decode().strip()
+                line = stdout.readline()
+                if not line:
+                    self._fail(process, 'eof')
+                    return
+                line = line.decode().strip()
                 if line:
                     values = [min(int(v), 8) for v in line.split(';') if v]
                     if len(values) == self.bars:
-                        with self.lock:
-                            self.audio_data = values
+                        back = self._back()
+                        back['levels'][:] = values
+                        np.multiply(back['levels'], 1 / 8, out=back['spectrum'])
+                        self._commit()
                         consecutive_errors = 0
                     else:
                         consecutive_errors += 1
-                if consecutive_errors > 10:
-                    Logger.warn("Multiple consecutive errors - restarting CAVA...")
-                    self.restart()
-                    consecutive_errors = 0
+            except ValueError:
+                consecutive_errors += 1
+            except Exception as e:
+                if self.running:
+                    Logger.error(f"CAVA communication error: {e}")
+                consecutive_errors += 1
+            if consecutive_errors > self.max_errors:
+                self._fail(process, 'malformed output')
+                return
+
+    def _read_binary(self, process):
+        # Fixed-size records of native-endian unsigned bars, no separators
+        dtype = np.uint16 if self.bit_format == 16 else np.uint8
+        record = bytearray(self.bars * np.dtype(dtype).itemsize)
+        view = memoryview(record)
+        raw = np.frombuffer(record, dtype=dtype)
+        scaled = np.zeros(self.bars, dtype=np.uint32)
+        scale = np.float32(1.0 / self.max_value)
+        stdout = process.stdout
+        consecutive_errors = 0
+        while self.running and process is self.process:
+            try:
+                filled = 0
+                while filled < len(record):
+                    count = stdout.readinto(view[filled:])
+                    if not count:
+                        raise EOFError("CAVA output closed")
+                    filled += count
+                # Decoded straight into the preallocated back frame
+                back = self._back()
+                np.multiply(raw, 8, out=scaled, dtype=np.uint32)
+                np.floor_divide(scaled, self.max_value, out=scaled)
+                np.minimum(scaled, 8, out=back['levels'])
+                np.multiply(raw, scale, out=back['spectrum'])
+                self._commit()
+                consecutive_errors = 0
+            except EOFError:
+                self._fail(process, 'eof')
+                return
             except Exception as e:
                 if self.running:
                     Logger.error(f"CAVA communication error: {e}")
                 consecutive_errors += 1
+                if consecutive_errors > self.max_errors:
+                    self._fail(process, 'malformed output')
+                    return
 
     def restart(self):
+        """Asks the supervisor to respawn CAVA with the existing config."""
         Logger.info("Restarting CAVA...")
-        try:
-            if os.path.exists(self.config_file):
-                os.remove(self.config_file)
-        except:
-            pass
-
-    def get_data(self):
-        with self.lock:
-            return self.audio_data
+        self.failure = 'restart requested'
 
     def stop(self):
-        self.running = False
+        with self.lock:
+            self.running = False
+            self.stopped.set()
         if self.process:
-            self.process.terminate()
+            self._terminate()
             self.process = None
             Logger.info("CAVA stopped")
         try:
             if os.path.exists(self.config_file):
                 os.remove(self.config_file)
         except:
-            pass 
\ No newline at end of file
+            pass
@@ -0,0 +1,74 @@
+from threading import Event
+from types import SimpleNamespace
+import numpy as np
+
+class FrameExchange:
+    """
+    Single-producer/single-consumer triple buffer for the latest audio frame.
+
+    Three preallocated slots rotate between the producer (writing), the newest
+    published frame (latest) and the consumer (reading). Every index is a
+    single attribute store, atomic under the GIL, so neither side takes a
+    lock: the producer fills back() and publish()es it, the consumer
+    acquire()s the newest slot as read-only views that stay valid until its
+    next acquire().
+    """
+    SLOTS = 3
+
+    def __init__(self, **fields):
+        # fields: name=(shape, dtype)
+        self.slots = []
+        self.frames = []
+        for _ in range(self.SLOTS):
+            arrays = {name: np.zeros(shape, dtype=dtype) for name, (shape, dtype) in fields.items()}
+            views = {}
+            for name, array in arrays.items():
+                views[name] = array.view()
+                views[name].flags.writeable = False
+            self.slots.append(arrays)
+            self.frames.append(SimpleNamespace(sequence=0, time=0.0, **views))
+        self.latest = 0
+        self.reading = 0
+        self.writing = 1
+        self.sequence = 0
+        self.time = 0.0
+        self.published = Event()
+
+    def back(self):
+        """Writable arrays of the slot the producer fills next."""
+        return self.slots[self.writing]
+
+    def publish(self, frame_time):
+        """Makes the back slot the latest frame and moves the producer to a free slot."""
+        slot = self.writing
+        frame = self.frames[slot]
+        frame.sequence = self.sequence + 1
+        frame.time = frame_time
+        self.latest = slot
+        self.sequence += 1
+        self.time = frame_time
+        # Neither the frame just published nor the one being read. A consumer
+        # claiming a slot after this read sees latest change and retries.
+        reading = self.reading
+        self.writing = next(s for s in range(self.SLOTS) if s != slot and s != reading)
+        self.published.set()
+
+    def acquire(self):
+        """Newest frame, released by the next acquire()."""
+        while True:
+            slot = self.latest
+            self.reading = slot
+            if self.latest == slot:
+                return self.frames[slot]
+
+    def newer_than(self, sequence):
+        return self.sequence != sequence
+
+    def wait(self, sequence, timeout):
+        """Blocks until a frame newer than sequence is published or timeout expires."""
+        if self.sequence == sequence:
+            self.published.clear()
+            # Published between the check and the clear: the sequence moved on
+            if self.sequence == sequence:
+                self.published.wait(timeout)
+        return self.sequence
@@ -0,0 +1,189 @@
+import math
+import numpy as np
+
+BASS, MID, TREBLE = 0, 1, 2
+
+class AudioFeatures:
+    """
+    Musical features derived once per audio frame and shared by every effect:
+
+        levels         0-8 level of every bar
+        smoothed,      smoothed and peak-hold bars (0-1) from the source's
+        peaks          smoothing stage, gathered per panel column in
+                       column_smoothed/column_peaks and per module in
+                       module_smoothed/module_peaks
+        bands          mean 0-8 level of the bass, mid and treble bands
+        band_sums      summed levels of each band
+        band_energy    bands normalized to 0-1
+        module_levels  levels of the panel columns covered by each module
+        module_mean    mean level of each module, module_low/module_high of
+                       its lower and upper half of columns, normalized to 0-1
+        flux, onset    spectral flux and whether it spiked above its average
+        beat, bpm      bass onset spaced like a beat, and the tempo estimate
+        loudness, gain mean spectrum and the automatic gain that brings its
+                       recent peak to 1 (normalized holds spectrum * gain)
+
+    All arrays are allocated once; update() only writes into them.
+    """
+    BEAT_HISTORY = 16
+
+    def __init__(self, bars, display, split=(0.25, 0.75), onset_threshold=1.5, onset_floor=0.02,
+                 flux_window=0.5, min_bpm=60, max_bpm=200, agc_release=10.0, framerate=60):
+        if bars <= 0 or not 0 < split[0] < split[1] < 1:
+            raise ValueError("Invalid feature band split")
+        if onset_threshold < 1 or flux_window <= 0 or agc_release <= 0 or not 0 < min_bpm < max_bpm:
+            raise ValueError("Invalid feature settings")
+        self.bars = bars
+        self.onset_threshold = onset_threshold
+        self.onset_floor = onset_floor
+        self.flux_window = flux_window
+        self.min_bpm = min_bpm
+        self.max_bpm = max_bpm
+        self.agc_release = agc_release
+        self.frame_interval = 1 / framerate
+
+        # Bar ranges of the three bands, at least one bar each
+        if bars >= 3:
+            low = min(max(1, round(bars * split[0])), bars - 2)
+            high = min(max(low + 1, round(bars * split[1])), bars - 1)
+            self.band_slices = [slice(0, low), slice(low, high), slice(high, bars)]
+        else:
+            self.band_slices = [slice(0, 1), slice(0, bars), slice(bars - 1, bars)]
+        self.band_widths = np.array([s.stop - s.start for s in self.band_slices], dtype=np.float32)
+
+        # Bar shown in every panel column and module column, as in BaseEffect.columns()
+        self.columns = np.arange(display.panel_width) * bars // display.panel_width
+        x0 = np.array([origin[0] for origin in display.origins])
+        self.module_columns = self.columns[x0[:, None] + np.arange(display.width)]
+        half = max(1, display.width // 2)
+
+        self.levels = np.zeros(bars, dtype=np.float32)
+        self.spectrum = np.zeros(bars, dtype=np.float32)
+        self.previous = np.zeros(bars, dtype=np.float32)
+        self.rise = np.zeros(bars, dtype=np.float32)
+        self.normalized = np.zeros(bars, dtype=np.float32)
+        self.smoothed = np.zeros(bars, dtype=np.float32)
+        self.peaks = np.zeros(bars, dtype=np.float32)
+        self.column_smoothed = np.zeros(len(self.columns), dtype=np.float32)
+        self.column_peaks = np.zeros(len(self.columns), dtype=np.float32)
+        self.module_smoothed = np.zeros(self.module_columns.shape, dtype=np.float32)
+        self.module_peaks = np.zeros(self.module_columns.shape, dtype=np.float32)
+        self.bands = np.zeros(3, dtype=np.float32)
+        self.band_sums = np.zeros(3, dtype=np.float32)
+        self.band_energy = np.zeros(3, dtype=np.float32)
+        self.module_levels = np.zeros(self.module_columns.shape, dtype=np.float32)
+        self.module_mean = np.zeros(len(x0), dtype=np.float32)
+        self.module_low = np.zeros(len(x0), dtype=np.float32)
+        self.module_high = np.zeros(len(x0), dtype=np.float32)
+        self.half = half
+        self.beat_times = np.zeros(self.BEAT_HISTORY)
+        self.beat_count = 0
+
+        self.time = 0.0
+        self.flux = 0.0
+        self.flux_average = 0.0
+        self.onset = False
+        self.bass = 0.0
+        self.bass_flux_average = 0.0
+        self.beat = False
+        self.last_beat = -math.inf
+        self.bpm = 0.0
+        self.loudness = 0.0
+        self.reference = 1e-3
+        self.gain = 1.0
+
+    @classmethod
+    def from_config(cls, config, bars, display, framerate=60):
+        return cls(
+            bars, display,
+            split=tuple(config.get('split', (0.25, 0.75))),
+            onset_threshold=config.get('onset_threshold', 1.5),
+            onset_floor=config.get('onset_floor', 0.02),
+            flux_window=config.get('flux_window', 0.5),
+            min_bpm=config.get('min_bpm', 60),
+            max_bpm=config.get('max_bpm', 200),
+            agc_release=config.get('agc_release', 10.0),
+            framerate=framerate
+        )
+
+    def beat_phase(self, now=None):
+        """Position within the current beat, 0-1, or 0 without a tempo."""
+        if not self.bpm:
+            return 0.0
+        elapsed = (self.time if now is None else now) - self.last_beat
+        return (elapsed * self.bpm / 60) % 1.0
+
+    def update(self, levels, spectrum, frame_time, smoothed=None, peaks=None):
+        """
+        Derives the features of a new audio frame; frame_time in seconds
+        (monotonic). Without smoothing curves the raw spectrum stands in.
+        """
+        dt = frame_time - self.time
+        if not 0 < dt < 1:
+            dt = self.frame_interval
+        self.time = frame_time
+        self.levels[:] = levels
+        self.spectrum[:] = spectrum
+        self.smoothed[:] = spectrum if smoothed is None else smoothed
+        self.peaks[:] = spectrum if peaks is None else peaks
+        np.take(self.smoothed, self.columns, out=self.column_smoothed)
+        np.take(self.peaks, self.columns, out=self.column_peaks)
+        np.take(self.smoothed, self.module_columns, out=self.module_smoothed)
+        np.take(self.peaks, self.module_columns, out=self.module_peaks)
+
+        for band, bars in enumerate(self.band_slices):
+            self.band_sums[band] = self.levels[bars].sum()
+        np.divide(self.band_sums, self.band_widths, out=self.bands)
+        np.multiply(self.bands, 1 / 8, out=self.band_energy)
+
+        np.take(self.levels, self.module_columns, out=self.module_levels)
+        self.module_levels.mean(axis=1, out=self.module_mean)
+        self.module_levels[:, :self.half].mean(axis=1, out=self.module_low)
+        self.module_levels[:, self.half:].mean(axis=1, out=self.module_high)
+        self.module_low *= 1 / 8
+        self.module_high *= 1 / 8
+
+        # Spectral flux: mean rise of the bars since the previous frame
+        np.subtract(self.spectrum, self.previous, out=self.rise)
+        np.maximum(self.rise, 0, out=self.rise)
+        self.previous[:] = self.spectrum
+        smoothing = 1 - math.exp(-dt / self.flux_window)
+        self.flux = float(self.rise.mean())
+        self.onset = self.flux > self.flux_average * self.onset_threshold + self.onset_floor
+        self.flux_average += (self.flux - self.flux_average) * smoothing
+
+        # Beats: onsets of the bass band, no closer than the fastest tempo allows
+        bass = self.rise[self.band_slices[BASS]]
+        self.bass = float(bass.mean())
+        self.beat = (self.bass > self.bass_flux_average * self.onset_threshold + self.onset_floor
+                     and frame_time - self.last_beat >= 60 / self.max_bpm)
+        self.bass_flux_average += (self.bass - self.bass_flux_average) * smoothing
+        if self.beat:
+            self.last_beat = frame_time
+            self.beat_times[self.beat_count % self.BEAT_HISTORY] = frame_time
+            self.beat_count += 1
+            self._estimate_tempo()
+
+        # Rolling AGC: peak follower with an exponential release
+        self.loudness = float(self.spectrum.mean())
+        self.reference = max(self.loudness, self.reference * math.exp(-dt / self.agc_release), 1e-3)
+        self.gain = 1 / self.reference
+        np.multiply(self.spectrum, self.gain, out=self.normalized)
+        np.minimum(self.normalized, 1, out=self.normalized)
+
+    def _estimate_tempo(self):
+        count = min(self.beat_count, self.BEAT_HISTORY)
+        if count < 4:
+            return
+        times = np.sort(self.beat_times[:count])
+        intervals = np.diff(times)
+        intervals = intervals[intervals < 60 / self.min_bpm * 2]
+        if not len(intervals):
+            return
+        bpm = 60 / float(np.median(intervals))
+        # Fold onto the configured range (double or half time)
+        while bpm < self.min_bpm:
+            bpm *= 2
+        while bpm > self.max_bpm:
+            bpm /= 2
+        self.bpm = bpm
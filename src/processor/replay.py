@@ -0,0 +1,45 @@
+from threading import Thread
+import time
+from src.base import Logger
+from src.processor.cava_manager import load_config
+from src.processor.source import AudioSource
+from src.recording import Recording
+
+class ReplaySource(AudioSource):
+    """
+    Audio source playing back a recording (see src/recording.py). The file is
+    memory-mapped and its frames are published at the captured timing, or as
+    fast as the renderer takes them with realtime off.
+    """
+
+    def __init__(self):
+        config = load_config()
+        options = config['audio'].get('replay', {})
+        if not options.get('path'):
+            raise ValueError("Replay needs a recording path")
+        self.recording = Recording(options['path'])
+        if not self.recording.bars or not len(self.recording):
+            raise ValueError(f"Recording has no audio frames: {options['path']}")
+        super().__init__(self.recording.bars, config['audio'].get('smoothing'))
+        if self.bars != config['audio']['bars']:
+            Logger.warn(f"Recording has {self.bars} bars, settings {config['audio']['bars']}")
+        self.realtime = options.get('realtime', True)
+        self.loop = options.get('loop', True)
+        self.running = False
+
+    def start(self):
+        self.running = True
+        Thread(target=self._play, daemon=True).start()
+        Logger.info(f"Replaying {len(self.recording)} frames ({self.recording.duration:.1f} s) "
+                    f"from {self.recording.path}")
+
+    def _play(self):
+        for record in self.recording.frames(self.realtime, self.loop):
+            if not self.running:
+                return
+            self._publish(record['levels'], record['spectrum'], time.monotonic())
+        Logger.info("Replay finished")
+
+    def stop(self):
+        self.running = False
+        Logger.info("Replay stopped")
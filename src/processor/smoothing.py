@@ -0,0 +1,73 @@
+import math
+import numpy as np
+
+class SpectrumSmoother:
+    """
+    Bar smoothing and peak hold on the whole normalized spectrum at once.
+
+    smoothed follows the raw bars with exponential attack and decay time
+    constants (0 = follow instantly). peaks jump to the smoothed level, stay
+    there for the hold time, then fall with gravity (full scale per second
+    squared) until the bar catches them again. Everything is scaled by the
+    time between frames, so the curves look the same at any frame rate.
+    """
+
+    def __init__(self, bars, attack=0.0, decay=0.2, hold=0.1, gravity=4.0):
+        if attack < 0 or decay < 0 or hold < 0 or gravity <= 0:
+            raise ValueError("Invalid smoothing settings")
+        self.attack = attack
+        self.decay = decay
+        self.hold = hold
+        self.gravity = gravity
+        self.raw = np.zeros(bars, dtype=np.float32)
+        self.smoothed = np.zeros(bars, dtype=np.float32)
+        self.peaks = np.zeros(bars, dtype=np.float32)
+        self.hold_left = np.zeros(bars, dtype=np.float32)
+        self.held = np.zeros(bars, dtype=np.float32)
+        self.rate = np.zeros(bars, dtype=np.float32)
+        self.mask = np.zeros(bars, dtype=bool)
+        self.fall = np.zeros(bars, dtype=np.float32)
+        self.time = None
+
+    @classmethod
+    def from_config(cls, config, bars):
+        return cls(
+            bars,
+            attack=config.get('attack', 0.0),
+            decay=config.get('decay', 0.2),
+            hold=config.get('hold', 0.1),
+            gravity=config.get('gravity', 4.0)
+        )
+
+    @staticmethod
+    def _coefficient(time_constant, dt):
+        # Fraction of the remaining distance covered in dt
+        if time_constant <= 0:
+            return 1.0
+        return 1.0 - math.exp(-dt / time_constant)
+
+    def update(self, spectrum, frame_time):
+        """Advances the curves to a new frame; frame_time in seconds (monotonic)."""
+        dt = 0.0 if self.time is None else max(0.0, frame_time - self.time)
+        self.time = frame_time
+        self.raw[:] = spectrum
+
+        # Attack where the bar rises, decay where it falls
+        np.less(self.raw, self.smoothed, out=self.mask)
+        self.rate.fill(self._coefficient(self.attack, dt))
+        np.copyto(self.rate, self._coefficient(self.decay, dt), where=self.mask)
+        np.subtract(self.raw, self.smoothed, out=self.fall)
+        self.fall *= self.rate
+        self.smoothed += self.fall
+
+        # Peaks caught by the bar restart their hold; the others wait, then
+        # fall from the held level by gravity * t^2 / 2 (exact at any dt)
+        self.hold_left -= dt
+        np.greater_equal(self.smoothed, self.peaks, out=self.mask)
+        np.copyto(self.held, self.smoothed, where=self.mask)
+        np.copyto(self.hold_left, self.hold, where=self.mask)
+        np.minimum(self.hold_left, 0, out=self.fall)
+        np.square(self.fall, out=self.fall)
+        self.fall *= self.gravity / 2
+        np.subtract(self.held, self.fall, out=self.peaks)
+        np.maximum(self.peaks, self.smoothed, out=self.peaks)
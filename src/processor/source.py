@@ -0,0 +1,134 @@
+import math
+import time
+import numpy as np
+from src.processor.exchange import FrameExchange
+from src.processor.smoothing import SpectrumSmoother
+
+class AudioSource:
+    """
+    Shared publishing side of the audio backends. The reader thread fills the
+    back slot of a lock-free frame exchange, directly or through _publish(),
+    and commits it once per decoded frame, which also runs the smoothing and
+    peak stage. The render thread (the single consumer) reads the latest frame
+    with latest()/get_data()/get_curves() as read-only views, or blocks in
+    wait_for_frame() until a newer frame arrives.
+    """
+
+    def __init__(self, bars, smoothing=None):
+        self.bars = bars
+        self.exchange = FrameExchange(
+            levels=((bars,), np.int64),
+            spectrum=((bars,), np.float32),
+            smoothed=((bars,), np.float32),
+            peaks=((bars,), np.float32)
+        )
+        self.smoother = SpectrumSmoother.from_config(smoothing or {}, bars)
+        # Running average of the time between published frames
+        self.frame_interval = 0.0
+        # Optional RecordingWriter capturing every published frame
+        self.recorder = None
+        # FrameMetrics receiving restart counts of supervised backends
+        self.metrics = None
+
+    @property
+    def sequence(self):
+        return self.exchange.sequence
+
+    @property
+    def frame_time(self):
+        """Monotonic capture time of the latest frame, 0.0 before the first one."""
+        return self.exchange.time
+
+    def frame_age(self, now=None):
+        """Seconds since the latest frame was captured, inf before the first one."""
+        if not self.exchange.time:
+            return math.inf
+        return (time.monotonic() if now is None else now) - self.exchange.time
+
+    @property
+    def input_rate(self):
+        """Frames per second actually received; falls towards 0 while the input stalls."""
+        if not self.frame_interval:
+            return 0.0
+        return 1.0 / max(self.frame_interval, self.frame_age())
+
+    def _back(self):
+        """Preallocated levels/spectrum arrays of the frame being produced."""
+        return self.exchange.back()
+
+    def _commit(self, frame_time=None):
+        """Publishes the back frame once its levels and spectrum are filled in."""
+        if frame_time is None:
+            frame_time = time.monotonic()
+        if self.exchange.time:
+            interval = frame_time - self.exchange.time
+            if self.frame_interval:
+                self.frame_interval += (interval - self.frame_interval) * 0.05
+            else:
+                self.frame_interval = interval
+        back = self.exchange.back()
+        self.smoother.update(back['spectrum'], frame_time)
+        np.copyto(back['smoothed'], self.smoother.smoothed)
+        np.copyto(back['peaks'], self.smoother.peaks)
+        if self.recorder is not None:
+            self.recorder.write(time.time(), back['levels'], back['spectrum'])
+        self.exchange.publish(frame_time)
+
+    def _publish(self, values, spectrum, frame_time=None):
+        back = self.exchange.back()
+        back['levels'][:] = values
+        back['spectrum'][:] = spectrum
+        self._commit(frame_time)
+
+    def latest(self):
+        """Newest frame: levels, spectrum, smoothed, peaks, sequence and time."""
+        return self.exchange.acquire()
+
+    def get_data(self):
+        return self.exchange.acquire().levels
+
+    def get_spectrum(self):
+        """Latest bars normalized to 0.0-1.0 at the full output resolution."""
+        return self.exchange.acquire().spectrum
+
+    def get_curves(self):
+        """Raw, smoothed and peak-hold bars (0.0-1.0) of the latest frame."""
+        frame = self.exchange.acquire()
+        return frame.spectrum, frame.smoothed, frame.peaks
+
+    def has_frame_after(self, sequence):
+        return self.exchange.newer_than(sequence)
+
+    def wait_for_frame(self, sequence, timeout):
+        """Blocks until a frame newer than sequence is published or timeout expires."""
+        return self.exchange.wait(sequence, timeout)
+
+class DecayedFrame:
+    """
+    Stand-in for a stale audio frame: the last bars and curves fading towards
+    zero with an exponential time constant. Has the fields of an exchange frame.
+    """
+
+    def __init__(self, bars, time_constant):
+        if time_constant <= 0:
+            raise ValueError("Invalid stale decay time")
+        self.time_constant = time_constant
+        self.levels = np.zeros(bars, dtype=np.int64)
+        self.spectrum = np.zeros(bars, dtype=np.float32)
+        self.smoothed = np.zeros(bars, dtype=np.float32)
+        self.peaks = np.zeros(bars, dtype=np.float32)
+        self.sequence = 0
+        self.time = 0.0
+        self.faded = False
+
+    def update(self, frame, stale_for, now):
+        factor = math.exp(-stale_for / self.time_constant)
+        # Below one 8-bit step nothing visible changes any more
+        self.faded = factor < 1 / 256
+        np.multiply(frame.levels, factor, out=self.levels, casting='unsafe')
+        np.multiply(frame.spectrum, factor, out=self.spectrum)
+        np.multiply(frame.smoothed, factor, out=self.smoothed)
+        np.multiply(frame.peaks, factor, out=self.peaks)
+        self.sequence = frame.sequence
+        self.time = now
+        return self
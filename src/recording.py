@@ -0,0 +1,218 @@
+"""
+Binary capture format for audio frames and rendered LED frames.
+
+A 32-byte header (magic, version, header size, bar count, pixel count) is
+followed by fixed-size records:
+
+    timestamp  float64       wall clock time of the frame
+    levels     uint8[bars]   0-8 levels as returned by get_data()
+    spectrum   float32[bars] normalized bars as returned by get_spectrum()
+    rgb        uint8[pixels][3] strip-order frame as sent to the output
+
+Audio-only captures have no pixels, display-only captures no bars. Records
+have a fixed size, so a capture cut short keeps every complete record, and a
+reader memory-maps the file and indexes records without parsing:
+
+    python3 -m src.recording info capture.ledr
+    python3 -m src.recording play capture.ledr [--fast] [--loop]
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from threading import Condition, Thread
+import numpy as np
+
+MAGIC = b'LEDR'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII16x')
+
+def record_dtype(bars, num_pixels):
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('levels', 'u1', (bars,)),
+        ('spectrum', '<f4', (bars,)),
+        ('rgb', 'u1', (num_pixels, 3))
+    ])
+
+class RecordingWriter:
+    """
+    Appends records from a background thread. write() copies the frame into a
+    preallocated ring of records and returns; when the disk falls behind and
+    the ring is full, new frames are dropped and counted instead of blocking
+    the caller.
+    """
+
+    def __init__(self, path, bars, num_pixels, queue_size=256):
+        self.path = path
+        self.bars = bars
+        self.num_pixels = num_pixels
+        self.dtype = record_dtype(bars, num_pixels)
+        self.records = np.zeros(queue_size, dtype=self.dtype)
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+        self.written = 0
+        self.running = True
+        self.ready = Condition()
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, HEADER.size, bars, num_pixels))
+        self.thread = Thread(target=self._write_loop, name='recording-writer', daemon=True)
+        self.thread.start()
+
+    def write(self, timestamp, levels=None, spectrum=None, rgb=None):
+        with self.ready:
+            if self.head - self.tail >= len(self.records):
+                self.dropped += 1
+                return
+        # The slot at head is only read by the writer thread once head moves past it
+        record = self.records[self.head % len(self.records)]
+        record['timestamp'] = timestamp
+        if self.bars:
+            record['levels'] = np.minimum(levels, 255) if levels is not None else 0
+            record['spectrum'] = spectrum if spectrum is not None else 0
+        if self.num_pixels:
+            record['rgb'] = rgb if rgb is not None else 0
+        with self.ready:
+            self.head += 1
+            self.ready.notify()
+
+    def _write_loop(self):
+        size = len(self.records)
+        while True:
+            with self.ready:
+                while self.running and self.head == self.tail:
+                    self.ready.wait()
+                if self.head == self.tail:
+                    return
+                start = self.tail % size
+                count = min(self.head - self.tail, size - start)
+            # Contiguous run of pending records, written without holding the lock
+            self.file.write(memoryview(self.records[start:start + count]).cast('B'))
+            with self.ready:
+                self.tail += count
+                self.written += count
+
+    def close(self):
+        """Writes the queued records and closes the file."""
+        if self.file is None:
+            return
+        with self.ready:
+            self.running = False
+            self.ready.notify()
+        self.thread.join()
+        self.file.close()
+        self.file = None
+
+class Recording:
+    """Memory-mapped capture; records is a read-only structured array over the file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"Not a recording: {path}")
+            magic, version, header_size, self.bars, self.num_pixels = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a version {VERSION} recording: {path}")
+            self.dtype = record_dtype(self.bars, self.num_pixels)
+            count = (os.fstat(f.fileno()).st_size - header_size) // self.dtype.itemsize
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if count else None
+        if count:
+            self.records = np.frombuffer(self.map, dtype=self.dtype, count=count, offset=header_size)
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self):
+        if len(self.records) < 2:
+            return 0.0
+        return float(self.records['timestamp'][-1] - self.records['timestamp'][0])
+
+    def frames(self, realtime=True, loop=False):
+        """Yields records, sleeping to reproduce the captured timing when realtime is set."""
+        if not len(self.records):
+            return
+        while True:
+            start = time.monotonic()
+            first = self.records['timestamp'][0]
+            for record in self.records:
+                if realtime:
+                    delay = start + (record['timestamp'] - first) - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                yield record
+            if not loop:
+                return
+
+    def close(self):
+        self.records = None
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                # Records still referenced elsewhere; the map goes with them
+                pass
+            self.map = None
+
+def play_frames(recording, output, realtime=True, loop=False):
+    """Sends the captured RGB frames to an output backend."""
+    if not recording.num_pixels:
+        raise ValueError("Recording has no LED frames")
+    if recording.num_pixels != output.num_pixels:
+        raise ValueError("Recording pixel count does not match the output")
+    frames = 0
+    for record in recording.frames(realtime, loop):
+        output.write(record['rgb'])
+        output.show()
+        frames += 1
+    return frames
+
+def main(argv=None):
+    from src.base import Logger
+    from src.output.base import create_backend
+    parser = argparse.ArgumentParser(description='Inspect or play back LEDCAVA recordings')
+    parser.add_argument('command', choices=('info', 'play'))
+    parser.add_argument('path')
+    parser.add_argument('--fast', action='store_true', help='Play as fast as possible instead of in real time')
+    parser.add_argument('--loop', action='store_true', help='Play the recording in a loop')
+    args = parser.parse_args(argv)
+
+    try:
+        recording = Recording(args.path)
+    except (OSError, ValueError) as e:
+        Logger.error(str(e))
+        return 1
+    if args.command == 'info':
+        rate = (len(recording) - 1) / recording.duration if recording.duration else 0.0
+        print(f"{args.path}: {len(recording)} records, {recording.duration:.1f} s ({rate:.1f} fps), "
+              f"{recording.bars} bars, {recording.num_pixels} pixels")
+        return 0
+    with open('settings.json', 'r') as f:
+        display_config = json.load(f)['display']
+    # Frames are captured after color correction, which already applied the brightness
+    corrected = display_config.get('correction', {}).get('enabled', False)
+    output = create_backend(display_config, 1.0 if corrected else display_config['brightness'])
+    output.begin()
+    try:
+        frames = play_frames(recording, output, realtime=not args.fast, loop=args.loop)
+        Logger.info(f"Played {frames} frames")
+    except ValueError as e:
+        Logger.error(str(e))
+        return 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        output.close()
+        recording.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
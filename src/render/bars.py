@@ -0,0 +1,71 @@
+import numpy as np
+from src.color import Palette
+
+class BarCompositor:
+    """
+    Column bars of a whole view in a few array operations: the levels are
+    compared against a row-index grid once per frame, giving the filled, peak
+    and fade-tail masks, and each region is painted in one copy.
+
+    fill, peak and background are an RGB color, a Palette (a vertical
+    gradient, sampled at (row + 1) / height) or an array of per-row colors.
+    tail > 0 fades the fill into the background over that many rows above
+    every bar. Rows count from the first row of the view; a level of n fills
+    rows 0 to n - 1.
+    """
+
+    def __init__(self, height, width, fill, background=(0, 0, 0), peak=None, tail=0):
+        if height <= 0 or width <= 0 or tail < 0:
+            raise ValueError("Invalid bar settings")
+        self.height = height
+        self.rows = np.arange(height)[:, None]
+        self.fill = self._colors(fill)
+        self.background = self._colors(background)
+        self.peak = None if peak is None else self._colors(peak)
+        self.tail = tail
+        self.lit = np.zeros((height, width), dtype=bool)
+        self.peaks = np.zeros((height, width), dtype=bool)
+        self.fade = np.zeros((height, width), dtype=np.float32)
+
+    def _colors(self, colors):
+        # Broadcastable against the (height, width, 3) view
+        if isinstance(colors, Palette):
+            colors = colors.lookup((np.arange(self.height) + 1) / self.height)
+        colors = np.asarray(colors, dtype=np.uint8)
+        if colors.ndim == 1:
+            return colors.reshape(1, 1, 3)
+        if colors.shape != (self.height, 3):
+            raise ValueError("Bar colors must be one color or one per row")
+        return colors[:, None]
+
+    def masks(self, levels, peaks=None):
+        """
+        Filled, peak and tail-fade masks of the bars (views reused by the next
+        call). Peaks mark the row of each peak level above its bar; the fade is
+        1 at the top of a bar, falling to 0 tail rows above it.
+        """
+        levels = np.asarray(levels)
+        np.less(self.rows, levels, out=self.lit)
+        if peaks is None:
+            self.peaks.fill(False)
+        else:
+            np.equal(self.rows, np.asarray(peaks).astype(int), out=self.peaks)
+            self.peaks &= ~self.lit
+        if self.tail:
+            np.subtract(self.rows, levels, out=self.fade, casting='unsafe')
+            self.fade *= -1 / self.tail
+            self.fade += 1
+            np.clip(self.fade, 0, 1, out=self.fade)
+        return self.lit, self.peaks, self.fade
+
+    def render(self, out, levels, peaks=None):
+        """Draws the bars of levels (and peak markers) into an (height, width, 3) view."""
+        lit, peak, fade = self.masks(levels, peaks)
+        out[:] = self.background
+        if self.tail:
+            # Fill color faded into the background above the bars
+            tail = self.background + (self.fill.astype(np.float32) - self.background) * fade[..., None]
+            np.copyto(out, tail, casting='unsafe')
+        if self.peak is not None:
+            np.copyto(out, self.peak, where=peak[..., None])
+        np.copyto(out, self.fill, where=lit[..., None])
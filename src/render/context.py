@@ -0,0 +1,51 @@
+from collections import namedtuple
+import time
+
+# What an effect needs to draw one frame, built once per render tick:
+#   t         monotonic time of the tick, seconds
+#   dt        seconds since the previous tick
+#   index     frame number since the clock started
+#   bars      0-8 levels of the audio frame
+#   sequence  sequence number of the audio frame
+#   features  AudioFeatures of the audio frame
+FrameContext = namedtuple('FrameContext', 't dt index bars sequence features')
+
+class Clock:
+    """Render clock on time.monotonic(): one FrameContext per tick."""
+
+    def __init__(self):
+        self.index = 0
+        self.time = None
+
+    def now(self):
+        return time.monotonic()
+
+    def tick(self, bars, sequence, features, now=None):
+        t = self.now() if now is None else now
+        dt = 0.0 if self.time is None else t - self.time
+        self.time = t
+        context = FrameContext(t, dt, self.index, bars, sequence, features)
+        self.index += 1
+        return context
+
+class VirtualClock(Clock):
+    """
+    Clock advancing exactly 1/framerate per tick, whatever the wall time, so
+    renders are reproducible and can run faster than real time.
+    """
+
+    def __init__(self, framerate=60, start=0.0):
+        super().__init__()
+        if framerate <= 0:
+            raise ValueError("Invalid clock framerate")
+        self.step = 1 / framerate
+        self.virtual = start
+
+    def now(self):
+        t = self.virtual
+        self.virtual += self.step
+        return t
+
+    def tick(self, bars, sequence, features, now=None):
+        # Real timestamps are ignored: virtual time only moves by steps
+        return super().tick(bars, sequence, features)
@@ -0,0 +1,96 @@
+import numpy as np
+
+class ParticleSystem:
+    """
+    Particles stored as struct-of-arrays buffers preallocated to a fixed
+    capacity. Live particles stay packed in [0, count); dead ones are removed
+    by moving live particles from the tail into their slots.
+    """
+
+    def __init__(self, capacity, width, height, rng=None):
+        self.capacity = capacity
+        self.width = width
+        self.height = height
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.fields = (self.x, self.y, self.vx, self.vy, self.life, self.kind)
+        self.count = 0
+        self._kernels = {}
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, amount, speed=0.3, kinds=1):
+        """Adds particles at random positions with gaussian velocities, up to capacity."""
+        amount = min(int(amount), self.capacity - self.count)
+        if amount <= 0:
+            return
+        new = slice(self.count, self.count + amount)
+        self.x[new] = self.rng.uniform(0, self.width, amount)
+        self.y[new] = self.rng.uniform(0, self.height, amount)
+        self.vx[new] = self.rng.normal(0, speed, amount)
+        self.vy[new] = self.rng.normal(0, speed, amount)
+        self.kind[new] = self.rng.integers(0, kinds, amount)
+        self.life[new] = 1.0
+        self.count += amount
+
+    def move(self, friction):
+        """Applies friction and advances positions, wrapping around the panel."""
+        live = slice(0, self.count)
+        self.vx[live] *= friction
+        self.vy[live] *= friction
+        x, y = self.x[live], self.y[live]
+        x += self.vx[live]
+        y += self.vy[live]
+        np.mod(x, self.width, out=x)
+        np.mod(y, self.height, out=y)
+
+    def remove_dead(self):
+        count = self.count
+        dead = np.flatnonzero(self.life[:count] <= 0)
+        if not len(dead):
+            return
+        keep = count - len(dead)
+        # Dead slots inside the kept range are refilled from live particles past it
+        holes = dead[dead < keep]
+        movers = np.flatnonzero(self.life[keep:count] > 0) + keep
+        for field in self.fields:
+            field[holes] = field[movers]
+        self.count = keep
+
+    def _kernel(self, radius, scale):
+        key = (radius, scale)
+        if key not in self._kernels:
+            # Cells at floor(p) + d with |p - cell| < radius / scale
+            reach = radius / scale
+            offsets = np.arange(-int(reach), int(reach) + 2)
+            dx, dy = np.meshgrid(offsets, offsets)
+            self._kernels[key] = (dx.ravel(), dy.ravel())
+        return self._kernels[key]
+
+    def splat(self, out, weights, radius, scale=1.0):
+        """
+        Accumulates weights * (radius - distance) into out[y, x] for every pixel
+        closer than radius to a particle, with distances multiplied by scale.
+        Cost grows with particles x kernel size, not with the pixel count.
+        """
+        count = self.count
+        if not count:
+            return out
+        dx, dy = self._kernel(radius, scale)
+        x = self.x[:count, None]
+        y = self.y[:count, None]
+        cell_x = np.floor(x).astype(np.int64) + dx
+        cell_y = np.floor(y).astype(np.int64) + dy
+        dist = np.hypot((x - cell_x) * scale, (y - cell_y) * scale)
+        height, width = out.shape
+        inside = (dist < radius) & (cell_x >= 0) & (cell_x < width) & (cell_y >= 0) & (cell_y < height)
+        contribution = (np.asarray(weights)[:count, None] * (radius - dist))[inside]
+        out += np.bincount(cell_y[inside] * width + cell_x[inside], contribution,
+                           minlength=width * height).reshape(height, width)
+        return out
@@ -0,0 +1,105 @@
+import numpy as np
+
+class MovementPoints:
+    """
+    Short-lived movement blips kept in growable struct-of-arrays buffers.
+    Each point belongs to a module and is rasterized into that module's grid.
+    """
+
+    def __init__(self, capacity=64):
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.intensity = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.direction = np.zeros(capacity)
+        self.module = np.zeros(capacity, dtype=np.int64)
+        self.count = 0
+        self._kernels = {}
+
+    def __len__(self):
+        return self.count
+
+    def _fields(self):
+        return ('x', 'y', 'intensity', 'life', 'direction', 'module')
+
+    def add(self, x, y, intensity, life, direction, module):
+        amount = len(x)
+        if not amount:
+            return
+        needed = self.count + amount
+        if needed > len(self.x):
+            capacity = max(needed, len(self.x) * 2)
+            for name in self._fields():
+                grown = np.zeros(capacity, dtype=getattr(self, name).dtype)
+                grown[:self.count] = getattr(self, name)[:self.count]
+                setattr(self, name, grown)
+        new = slice(self.count, needed)
+        self.x[new] = x
+        self.y[new] = y
+        self.intensity[new] = intensity
+        self.life[new] = life
+        self.direction[new] = direction
+        self.module[new] = module
+        self.count = needed
+
+    def remove_dead(self):
+        alive = self.life[:self.count] > 0
+        keep = int(alive.sum())
+        if keep == self.count:
+            return
+        for name in self._fields():
+            field = getattr(self, name)
+            field[:keep] = field[:self.count][alive]
+        self.count = keep
+
+    def move_towards(self, center_x, center_y, speed):
+        """Pulls every point towards its center by speed, plus its sideways drift."""
+        count = self.count
+        x, y = self.x[:count], self.y[:count]
+        dx = center_x - x
+        dy = center_y - y
+        dist = np.sqrt(dx * dx + dy * dy)
+        moving = dist > 0
+        step = np.divide(speed, dist, out=np.zeros(count), where=moving)
+        drift = np.where(moving, self.direction[:count], 0.0)
+        x += dx * step + drift
+        y += dy * step + drift
+
+    def _kernel(self, radius):
+        if radius not in self._kernels:
+            # Cells at floor(p) + d with |p - cell| < radius
+            offsets = np.arange(-int(radius), int(radius) + 2)
+            dx, dy = np.meshgrid(offsets, offsets)
+            self._kernels[radius] = (dx.ravel(), dy.ravel())
+        return self._kernels[radius]
+
+    def rasterize(self, out, weights, radius, falloff, box=False):
+        """
+        Writes max(weights * (1 - distance / falloff)) into out[module, y, x] for
+        the pixels within radius of each point (a square of half-side radius
+        when box is set). Each point only visits the cells of its own bucket
+        neighbourhood instead of every pixel scanning every point.
+        """
+        out.fill(0)
+        count = self.count
+        if not count:
+            return out
+        dx, dy = self._kernel(radius)
+        x = self.x[:count, None]
+        y = self.y[:count, None]
+        cell_x = np.floor(x).astype(np.int64) + dx
+        cell_y = np.floor(y).astype(np.int64) + dy
+        offset_x = x - cell_x
+        offset_y = y - cell_y
+        dist = np.sqrt(offset_x ** 2 + offset_y ** 2)
+        if box:
+            near = (np.abs(offset_x) < radius) & (np.abs(offset_y) < radius)
+        else:
+            near = dist < radius
+        modules, height, width = out.shape
+        near &= (cell_x >= 0) & (cell_x < width) & (cell_y >= 0) & (cell_y < height)
+        value = (np.asarray(weights)[:count, None] * (1 - dist / falloff))[near]
+        module = np.broadcast_to(self.module[:count, None], near.shape)[near]
+        index = (module * height + cell_y[near]) * width + cell_x[near]
+        np.maximum.at(out.reshape(-1), index, value)
+        return out
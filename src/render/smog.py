@@ -0,0 +1,62 @@
+import numpy as np
+
+class SmogField:
+    """
+    Drifting smog particles rasterized into a density field once per frame.
+    Each particle covers a disc of its size; overlapping discs keep the densest
+    contribution. Cost grows with the particle count, not the pixel count.
+    """
+
+    def __init__(self, count, width, height, min_size=1.5, max_size=3.0, rng=None):
+        self.width = width
+        self.height = height
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.x = self.rng.uniform(0, width, count)
+        self.y = self.rng.uniform(0, height, count)
+        self.size = self.rng.uniform(min_size, max_size, count)
+        self.speed = self.rng.uniform(0.02, 0.08, count)
+        self.phase = self.rng.uniform(0, 2 * np.pi, count)
+        self.density = self.rng.uniform(0.3, 0.7, count)
+        self.field = np.zeros((height, width))
+        self.wobble = np.zeros(count)
+        # Cells at floor(p) + d, d in [-reach, reach + 1], cover every disc
+        reach = int(np.ceil(max_size))
+        offsets = np.arange(-reach, reach + 2)
+        dx, dy = np.meshgrid(offsets, offsets)
+        self.kernel = (dx.ravel(), dy.ravel())
+
+    def advance(self, time_val, delta_time):
+        """Moves the particles up by speed per 60 Hz frame and sways them sideways."""
+        self.y += self.speed * delta_time * 60
+        np.mod(self.y, self.height, out=self.y)
+        self.wobble = self.x + np.sin(time_val + self.phase) * 0.5
+
+    def rasterize(self):
+        """Returns the [y, x] density field, 0 where no particle reaches."""
+        field = self.field
+        field.fill(0)
+        dx, dy = self.kernel
+        x = self.wobble[:, None]
+        y = self.y[:, None]
+        cell_x = np.floor(x).astype(np.int64) + dx
+        cell_y = np.floor(y).astype(np.int64) + dy
+        dist = np.hypot(cell_x - x, cell_y - y)
+        size = self.size[:, None]
+        inside = ((dist < size) & (cell_x >= 0) & (cell_x < self.width)
+                  & (cell_y >= 0) & (cell_y < self.height))
+        contribution = ((1 - dist / size) * self.density[:, None])[inside]
+        np.maximum.at(field.reshape(-1), cell_y[inside] * self.width + cell_x[inside], contribution)
+        return field
+
+    @staticmethod
+    def glow(neon, density, smog):
+        """
+        Diffuses a neon channel through the smog: unlit pixels show the smog
+        level scaled by density, lit ones are softened and tinted towards it.
+        """
+        haze = smog * (density * 0.7)
+        factor = density * 0.6
+        diffused = (neon * (1 - density * 0.4)).astype(int)
+        influence = (smog * 0.7 + neon * 0.3).astype(int)
+        lit = diffused * (1 - factor) + influence * factor
+        return np.where(neon > 0, lit, haze).astype(int)
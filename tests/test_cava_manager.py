@@ -0,0 +1,29 @@
+import io
+import json
+import numpy as np
+import pytest
+from src.processor.cava_manager import CAVAManager
+
+class FakeProcess:
+    def __init__(self, data):
+        self.stdout = io.BytesIO(data)
+
+def binary_manager(tmp_path, monkeypatch, bit_format, bars=4):
+    settings = {'audio': {'bars': bars, 'framerate': 60, 'data_format': 'binary', 'bit_format': bit_format}}
+    (tmp_path / 'settings.json').write_text(json.dumps(settings))
+    monkeypatch.chdir(tmp_path)
+    return CAVAManager()
+
+@pytest.mark.parametrize('bit_format, dtype', [(16, np.uint16), (8, np.uint8)])
+def test_binary_full_scale_is_level_8(tmp_path, monkeypatch, bit_format, dtype):
+    cava = binary_manager(tmp_path, monkeypatch, bit_format)
+    full = np.iinfo(dtype).max
+    record = np.array([full, full // 2 + 1, 0, full], dtype=dtype)
+    process = FakeProcess(record.tobytes())
+    cava.process = process
+    cava.running = True
+    cava._read_binary(process)
+    frame = cava.latest()
+    assert frame.levels.tolist() == [8, 4, 0, 8]
+    assert frame.spectrum[0] == pytest.approx(1.0)
+    assert cava.failure == 'eof'
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the cava executable that writes a synthetic spectrum to stdout
+in the raw output format selected by the config file. Point
+audio.executable in settings.json at this script to run without audio
+hardware, e.g. "python3 tools/fake_cava.py".
+
+--fail MODE makes it misbehave after --fail-after seconds, or whenever it
+receives SIGUSR1, to exercise the CAVA supervisor: exit (non-zero exit
+code), eof (closes its output), stall (stops writing) or garbage (writes
+unparsable lines, only detectable in the ascii format).
+"""
+import argparse
+import configparser
+import math
+import os
+import signal
+import struct
+import sys
+import time
+
+def load_config(path):
+    parser = configparser.ConfigParser(strict=False)
+    parser.read(path)
+    return {
+        'bars': parser.getint('general', 'bars', fallback=16),
+        'framerate': parser.getint('general', 'framerate', fallback=60),
+        'data_format': parser.get('output', 'data_format', fallback='ascii'),
+        'bit_format': parser.get('output', 'bit_format', fallback='16bit'),
+        'ascii_max_range': parser.getint('output', 'ascii_max_range', fallback=1000)
+    }
+
+def synthetic_frame(frame, bars):
+    """Sweeping peak over a slow bass pulse, values in 0.0-1.0."""
+    t = frame / 60.0
+    center = (math.sin(t * 0.7) * 0.5 + 0.5) * (bars - 1)
+    bass = math.sin(t * 2 * math.pi * 2) * 0.5 + 0.5
+    values = []
+    for i in range(bars):
+        sweep = math.exp(-((i - center) ** 2) / 4.0)
+        tilt = bass * max(0.0, 1.0 - i / (bars / 3))
+        values.append(min(1.0, sweep * 0.8 + tilt * 0.6))
+    return values
+
+def fail(mode, out, bars):
+    if mode == 'exit':
+        sys.exit(1)
+    if mode == 'eof':
+        # Output closed while the process keeps running
+        os.close(out.fileno())
+    if mode in ('eof', 'stall'):
+        while True:
+            time.sleep(1)
+    # garbage: lines that never parse
+    while True:
+        out.write(b'x' * (bars + 1) + b';\n')
+        out.flush()
+        time.sleep(0.01)
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake CAVA raw output')
+    parser.add_argument('-p', dest='config', required=True, help='CAVA config file')
+    parser.add_argument('--fail', choices=('exit', 'eof', 'stall', 'garbage'), help='Failure to simulate')
+    parser.add_argument('--fail-after', type=float, help='Seconds before failing (default: on SIGUSR1 only)')
+    args = parser.parse_args()
+    failing = []
+    if args.fail:
+        signal.signal(signal.SIGUSR1, lambda signum, frame: failing.append(True))
+    fail_at = time.monotonic() + args.fail_after if args.fail and args.fail_after is not None else math.inf
+    config = load_config(args.config)
+    bars = config['bars']
+    interval = 1.0 / config['framerate']
+    out = sys.stdout.buffer
+    if config['data_format'] == 'binary':
+        bits = 8 if config['bit_format'] == '8bit' else 16
+        max_value = (1 << bits) - 1
+        record = struct.Struct(f"={bars}{'B' if bits == 8 else 'H'}")
+        encode = lambda values: record.pack(*(int(v * max_value) for v in values))
+    else:
+        max_range = config['ascii_max_range']
+        encode = lambda values: (';'.join(str(int(v * max_range)) for v in values) + ';\n').encode()
+
+    frame = 0
+    next_frame = time.monotonic()
+    try:
+        while True:
+            if failing or time.monotonic() >= fail_at:
+                fail(args.fail, out, bars)
+            out.write(encode(synthetic_frame(frame, bars)))
+            out.flush()
+            frame += 1
+            next_frame += interval
+            time.sleep(max(0.0, next_frame - time.monotonic()))
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+
+if __name__ == '__main__':
+    main()